@@ -0,0 +1,3 @@
+"""
+Utilidades compartidas por el dashboard y los notebooks del proyecto Liga 24-25.
+"""
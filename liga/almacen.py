@@ -0,0 +1,272 @@
+"""
+Almacén columnar de partidos, particionado por liga y temporada.
+
+El CSV `outputs/partidos_con_clima_completo.csv` tiene ~130 columnas (la mayoría
+cuotas) y parsearlo como texto en cada recarga del dashboard es caro. Aquí lo
+convertimos una sola vez a Parquet y las páginas leen únicamente las columnas
+que necesitan (el formato es columnar, así que el resto no se toca).
+
+Cada liga y temporada va en su propia carpeta (estilo Hive):
+    outputs/almacen/partidos/liga=SP1/temporada=2024-25/partidos.parquet
+así que al pedir una liga o unas temporadas solo se abren sus ficheros. Se
+pueden añadir más CSV con el mismo esquema (otras temporadas u otras ligas);
+`_fuentes.json` recuerda de qué CSV sale cada partición para reconstruirla
+cuando el CSV cambia.
+
+Uso desde la terminal para (re)construir el almacén:
+    python -m liga.almacen
+    python -m liga.almacen --csv outputs/E0_con_clima.csv --liga E0
+    python -m liga.almacen --listar
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from liga.ligas import LIGA_POR_DEFECTO, temporada_de
+from liga.nombres import EQUIPOS, ESTADIOS
+from liga.union import imprimir_nombres
+
+RUTA_CSV_PARTIDOS = "outputs/partidos_con_clima_completo.csv"
+CARPETA_ALMACEN = "outputs/almacen"
+RUTA_ALMACEN_PARTIDOS = os.path.join(CARPETA_ALMACEN, "partidos")
+COLUMNAS_PARTICION = ["liga", "temporada"]
+FICHERO_FUENTES = "_fuentes.json"   # los nombres con "_" o "." no los lee pyarrow.dataset
+VERSION_ESQUEMA = 4                 # si cambia, las particiones se reconstruyen
+
+# Esquema fijo: estas columnas son texto, "Date" es fecha y todo lo demás es numérico
+COLUMNAS_TEXTO = ["Div", "Local", "Visitante", "Estadio", "Time", "FTR", "HTR", "Referee"]
+
+# Esquema compacto en memoria (leer_partidos(compacto=True)): categorías para
+# los textos, enteros pequeños para los recuentos y float32 para cuotas y clima
+COLUMNAS_CATEGORICAS = ["Div", "Local", "Visitante", "Estadio", "FTR", "HTR", "Referee"]
+ENTEROS_COMPACTOS = {
+    "Asistencia": pa.int32(),
+    **{c: pa.int8() for c in ["FTHG", "FTAG", "HTHG", "HTAG", "HS", "AS", "HST", "AST", "HF", "AF",
+                              "HC", "AC", "HY", "AY", "HR", "AR", "HO", "AO", "HBP", "ABP", "Codigo_Clima"]},
+}
+COLUMNAS_FLOAT64 = ["Longitud", "Latitud"]   # las coordenadas identifican al estadio: se quedan exactas
+
+
+def _ruta_particion(ruta_almacen, liga, temporada):
+    return os.path.join(ruta_almacen, f"liga={liga}", f"temporada={temporada}")
+
+
+def _leer_fuentes(ruta_almacen):
+    ruta = os.path.join(ruta_almacen, FICHERO_FUENTES)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _guardar_fuentes(ruta_almacen, fuentes):
+    ruta = os.path.join(ruta_almacen, FICHERO_FUENTES)
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(fuentes, f, ensure_ascii=False, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def almacen_actualizado(ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS):
+    """
+    Indica si las particiones que salen del CSV existen y son posteriores a él
+    """
+    fuente = _leer_fuentes(ruta_almacen).get(os.path.abspath(ruta_csv))
+    if fuente is None or fuente["mtime"] < os.path.getmtime(ruta_csv) or fuente.get("version") != VERSION_ESQUEMA:
+        return False
+    return all(os.path.isdir(_ruta_particion(ruta_almacen, fuente["liga"], t)) for t in fuente["temporadas"])
+
+
+def tipar_partidos(df):
+    """
+    Aplica el esquema fijo a los partidos leídos del CSV. Varias cuotas llegan
+    como texto (con huecos en blanco); se convierten a número aquí, una sola
+    vez, para que ni las páginas ni los modelos tengan que volver a hacerlo.
+    Los equipos y estadios se guardan con su nombre canónico (liga.nombres),
+    sin el relleno de espacios del fichero de Hop.
+    """
+    df["Local"] = EQUIPOS.resolver(df["Local"])
+    df["Visitante"] = EQUIPOS.resolver(df["Visitante"])
+    df["Estadio"] = ESTADIOS.resolver(df["Estadio"])
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
+    for columna in df.columns:
+        if columna not in COLUMNAS_TEXTO and columna != "Date" and df[columna].dtype == object:
+            df[columna] = pd.to_numeric(df[columna], errors="coerce")
+    return df
+
+
+def construir_almacen(ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS, liga=LIGA_POR_DEFECTO):
+    """
+    Lee el CSV una única vez y guarda cada temporada como Parquet tipado en la
+    partición de `liga`. La fecha se guarda ya convertida a datetime y las
+    cuotas como números para no volver a parsearlas. Las particiones de otros
+    CSV no se tocan.
+    """
+    df = tipar_partidos(pd.read_csv(ruta_csv))
+    temporadas = temporada_de(df["Date"])
+
+    os.makedirs(ruta_almacen, exist_ok=True)
+    clave = os.path.abspath(ruta_csv)
+    fuentes = _leer_fuentes(ruta_almacen)
+    for temporada, grupo in df.groupby(temporadas, sort=True):
+        carpeta = _ruta_particion(ruta_almacen, liga, temporada)
+        os.makedirs(carpeta, exist_ok=True)
+        # Escribimos a un temporal (oculto para pyarrow.dataset) y renombramos para
+        # que un lector concurrente nunca vea un fichero a medio escribir
+        ruta_tmp = os.path.join(carpeta, ".partidos.parquet.tmp")
+        grupo.to_parquet(ruta_tmp, index=False)
+        os.replace(ruta_tmp, os.path.join(carpeta, "partidos.parquet"))
+
+    # Si el CSV ya no tiene alguna temporada que sí tenía, su partición sobra
+    anterior = fuentes.get(clave)
+    nuevas = sorted(temporadas.unique())
+    if anterior is not None:
+        sobrantes = set(anterior["temporadas"]) - (set(nuevas) if anterior["liga"] == liga else set())
+        for temporada in sobrantes:
+            shutil.rmtree(_ruta_particion(ruta_almacen, anterior["liga"], temporada), ignore_errors=True)
+    fuentes[clave] = {"liga": liga, "temporadas": nuevas, "mtime": os.path.getmtime(ruta_csv), "version": VERSION_ESQUEMA}
+    _guardar_fuentes(ruta_almacen, fuentes)
+    return ruta_almacen
+
+
+def _sincronizar(ruta_csv, ruta_almacen):
+    """
+    Si el CSV es más nuevo que sus particiones, las reconstruye (en su liga de siempre)
+    """
+    if ruta_csv is None or almacen_actualizado(ruta_csv, ruta_almacen):
+        return
+    fuente = _leer_fuentes(ruta_almacen).get(os.path.abspath(ruta_csv))
+    construir_almacen(ruta_csv, ruta_almacen, fuente["liga"] if fuente else LIGA_POR_DEFECTO)
+
+
+def particiones(ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS):
+    """
+    Diccionario {liga: [temporadas ordenadas]} leyendo solo los nombres de las carpetas
+    """
+    _sincronizar(ruta_csv, ruta_almacen)
+    disponibles = {}
+    if not os.path.isdir(ruta_almacen):
+        return disponibles
+    for carpeta_liga in sorted(os.listdir(ruta_almacen)):
+        if not carpeta_liga.startswith("liga="):
+            continue
+        temporadas = sorted(
+            t.split("=", 1)[1] for t in os.listdir(os.path.join(ruta_almacen, carpeta_liga))
+            if t.startswith("temporada=")
+        )
+        if temporadas:
+            disponibles[carpeta_liga.split("=", 1)[1]] = temporadas
+    return disponibles
+
+
+def _dataset(ruta_almacen, ligas=None, temporadas=None):
+    """
+    Dataset de Arrow con solo los ficheros de las particiones pedidas. Si el
+    esquema cambia entre particiones (una columna nueva, o vacía en una
+    temporada) se unifica: lo que falta en un fichero se lee como nulo.
+    """
+    particionado = ds.partitioning(pa.schema([("liga", pa.string()), ("temporada", pa.string())]), flavor="hive")
+    dataset = ds.dataset(ruta_almacen, format="parquet", partitioning=particionado)
+    filtro = None
+    if ligas is not None:
+        filtro = ds.field("liga").isin(list(ligas))
+    if temporadas is not None:
+        condicion = ds.field("temporada").isin(list(temporadas))
+        filtro = condicion if filtro is None else filtro & condicion
+    fragmentos = list(dataset.get_fragments(filter=filtro))
+    esquemas = [f.physical_schema for f in fragmentos] or [dataset.schema]
+    esquema = pa.unify_schemas(esquemas, promote_options="permissive")
+    for columna in COLUMNAS_PARTICION:
+        esquema = esquema.append(pa.field(columna, pa.string()))
+    return ds.dataset([f.path for f in fragmentos], schema=esquema, format="parquet",
+                      partitioning=particionado, partition_base_dir=ruta_almacen)
+
+
+def _compactar(tabla):
+    """
+    Aplica el esquema compacto a una tabla de Arrow. Un recuento con huecos no
+    cabe en un entero, así que se queda en float32.
+    """
+    campos = []
+    for campo in tabla.schema:
+        tipo = campo.type
+        if campo.name in ENTEROS_COMPACTOS and tabla.column(campo.name).null_count == 0:
+            tipo = ENTEROS_COMPACTOS[campo.name]
+        elif campo.name in ENTEROS_COMPACTOS or (pa.types.is_floating(tipo) and campo.name not in COLUMNAS_FLOAT64):
+            tipo = pa.float32()
+        campos.append(campo.with_type(tipo))
+    return tabla.cast(pa.schema(campos))
+
+
+def columnas_disponibles(ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS):
+    """
+    Devuelve la lista de columnas del almacén (sin las de partición) leyendo solo metadatos
+    """
+    _sincronizar(ruta_csv, ruta_almacen)
+    return [c for c in _dataset(ruta_almacen).schema.names if c not in COLUMNAS_PARTICION]
+
+
+def leer_partidos(columnas=None, excluir=None, ligas=None, temporadas=None,
+                  ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS, compacto=False):
+    """
+    Lee los partidos desde el almacén columnar.
+
+    columnas: lista de columnas a leer (None = todas). "liga" y "temporada"
+              solo se devuelven si se piden.
+    excluir: columnas que no se quieren leer; útil cuando una página necesita
+             "todo menos" un conjunto conocido (por ejemplo las de leakage).
+    ligas, temporadas: particiones a leer (None = todas); las demás ni se abren.
+    compacto: aplica el esquema compacto (categorías, int8/int32 y float32);
+              ocupa ~3 veces menos, pero los modelos leen con precisión completa.
+    Si el CSV es más nuevo que sus particiones, se reconstruyen antes.
+    """
+    _sincronizar(ruta_csv, ruta_almacen)
+    dataset = _dataset(ruta_almacen, ligas, temporadas)
+
+    if columnas is None:
+        columnas = [c for c in dataset.schema.names if c not in COLUMNAS_PARTICION]
+    if excluir:
+        columnas = [c for c in columnas if c not in set(excluir)]
+
+    tabla = dataset.to_table(columns=columnas)
+    if not compacto:
+        return tabla.to_pandas()
+    # Los textos pasan a Categorical directamente desde Arrow, sin crear antes los objetos str
+    return _compactar(tabla).to_pandas(categories=[c for c in COLUMNAS_CATEGORICAS if c in tabla.column_names])
+
+
+def cargar_partidos(ruta_csv=RUTA_CSV_PARTIDOS, ruta_almacen=RUTA_ALMACEN_PARTIDOS, ligas=None, temporadas=None, compacto=False):
+    """
+    Partidos tal y como los usa el dashboard: fecha como datetime y hora como time
+    """
+    df = leer_partidos(ligas=ligas, temporadas=temporadas, ruta_csv=ruta_csv, ruta_almacen=ruta_almacen, compacto=compacto)
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
+    df["Time"] = pd.to_datetime(df["Time"], format="%H:%M", errors="coerce").dt.time
+    if compacto:
+        df["Time"] = df["Time"].astype("category")
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construye el almacén Parquet particionado por liga y temporada")
+    parser.add_argument("--csv", default=RUTA_CSV_PARTIDOS, help="CSV de partidos con el esquema del dataset principal")
+    parser.add_argument("--liga", default=LIGA_POR_DEFECTO, help="Código de la liga del CSV (SP1, E0, I1...)")
+    parser.add_argument("--almacen", default=RUTA_ALMACEN_PARTIDOS)
+    parser.add_argument("--listar", action="store_true", help="Solo muestra las particiones disponibles")
+    args = parser.parse_args(argv)
+
+    if not args.listar:
+        ruta = construir_almacen(args.csv, args.almacen, args.liga)
+        print(f"[OK] Almacén generado en: {ruta}")
+        imprimir_nombres()
+    for liga, temporadas in particiones(None, args.almacen).items():
+        print(f"   > {liga}: {', '.join(temporadas)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Benchmarks del dashboard sin navegador.
+
+Mide dos cosas:
+- cada sección de dashboard.py ejecutada con el AppTest de Streamlit: el
+  tiempo de la primera visita (cachés vacías) y la mediana de las recargas;
+- la carga de datos (`cargar_partidos`) con 1, 10 y 100 temporadas
+  sintéticas (liga.sintetico), en los dos modos: compacto (categorías,
+  int8/int32 y float32, como en `load_data()` del dashboard) y sin compactar.
+
+Cada caso se ejecuta en un proceso nuevo para que el pico de memoria (RSS)
+sea solo suyo. El resultado se guarda en JSON (tiempo, pico de RSS y filas
+por segundo) y se puede comparar con una ejecución anterior: si algún caso
+es más lento que la tolerancia, el comando termina con código 1.
+
+Los modelos entrenados que ya estén en outputs/modelos/ se reutilizan, así
+que la primera visita a las predicciones depende de ese registro.
+
+Uso desde la terminal:
+    python -m liga.benchmark
+    python -m liga.benchmark --casos carga resumen --escalas 1 10
+    python -m liga.benchmark --comparar outputs/benchmarks/benchmark_anterior.json
+"""
+
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from liga.almacen import RUTA_CSV_PARTIDOS, cargar_partidos, construir_almacen, leer_partidos
+from liga.sintetico import escribir_sintetico
+
+RUTA_DASHBOARD = "dashboard.py"
+CARPETA_BENCHMARKS = "outputs/benchmarks"
+TIMEOUT_PAGINA = 600
+ESCALAS = [1, 10, 100]
+REPETICIONES = 3
+TOLERANCIA = 0.2
+
+PAGINA_PREDICCION = "🏟️ Predicción en los Partidos"
+SECCIONES = {
+    "resumen": ("📊 Resumen", None),
+    "goles": ("⚽ Goles", None),
+    "clima": ("🌦️ Clima", None),
+    "estadios": ("🗺️ Estadios", None),
+    "asistencia": ("👥 Asistencia", None),
+    "apuestas": ("💰 Mercado de Apuestas", None),
+    "datos": ("📋 Datos", None),
+    "prediccion_resultado": (PAGINA_PREDICCION, "Predicción sobre el resultado de un partido."),
+    "prediccion_asistencia": (PAGINA_PREDICCION, "Predicción sobre la asistencia a un partido."),
+}
+
+
+# ---------------------------------
+# MEDICIÓN EN UN PROCESO APARTE
+# ---------------------------------
+def _rss_pico_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _con_memoria(funcion, *args):
+    resultado = funcion(*args)
+    resultado["rss_pico_mb"] = _rss_pico_mb()
+    return resultado
+
+
+def _en_proceso(funcion, *args):
+    contexto = multiprocessing.get_context("spawn")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+        return ejecutor.submit(_con_memoria, funcion, *args).result()
+
+
+# ---------------------------------
+# SECCIONES DEL DASHBOARD
+# ---------------------------------
+def medir_seccion(pagina, subpagina=None, repeticiones=REPETICIONES):
+    """
+    Abre el dashboard con AppTest, entra en la sección y la recarga `repeticiones` veces
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest resuelve las rutas relativas desde este fichero, no desde el directorio de trabajo
+    app = AppTest.from_file(os.path.abspath(RUTA_DASHBOARD), default_timeout=TIMEOUT_PAGINA)
+    inicio = time.perf_counter()
+    app.run()
+    arranque = time.perf_counter() - inicio
+
+    tiempos = []
+    for i in range(repeticiones + 1):
+        inicio = time.perf_counter()
+        if i == 0:
+            app.sidebar.radio[0].set_value(pagina).run()
+            if subpagina:
+                app.main.radio[0].set_value(subpagina).run()
+        else:
+            app.run()
+        tiempos.append(time.perf_counter() - inicio)
+        if app.exception:
+            raise RuntimeError(f"{pagina}: {app.exception[0].message}")
+
+    return {
+        "filas": len(leer_partidos(columnas=["Date"])),
+        "arranque_s": arranque,
+        "primera_visita_s": tiempos[0],
+        "tiempo_s": statistics.median(tiempos[1:]) if repeticiones else tiempos[0],
+    }
+
+
+# ---------------------------------
+# CARGA DE DATOS
+# ---------------------------------
+def datos_sinteticos(escala, carpeta, ruta_csv=RUTA_CSV_PARTIDOS):
+    """
+    Escribe en `carpeta` un CSV con `escala` temporadas sintéticas (liga.sintetico)
+    """
+    ruta = os.path.join(carpeta, f"partidos_x{escala}.csv")
+    if not os.path.exists(ruta):
+        escribir_sintetico(ruta, escala, ruta_csv=ruta_csv)
+    return ruta
+
+
+def medir_carga(ruta_csv, repeticiones=REPETICIONES, compacto=True):
+    """
+    Construye el almacén Parquet desde el CSV y mide `cargar_partidos` sobre él
+    (con compacto=True, como lo carga el dashboard)
+    """
+    ruta_almacen = os.path.splitext(ruta_csv)[0] + "_almacen"
+    inicio = time.perf_counter()
+    construir_almacen(ruta_csv, ruta_almacen)
+    construccion = time.perf_counter() - inicio
+
+    tiempos = []
+    for _ in range(max(1, repeticiones)):
+        inicio = time.perf_counter()
+        df = cargar_partidos(ruta_csv, ruta_almacen, compacto=compacto)
+        tiempos.append(time.perf_counter() - inicio)
+    return {"filas": len(df), "construccion_almacen_s": construccion, "tiempo_s": statistics.median(tiempos)}
+
+
+# ---------------------------------
+# EJECUCIÓN Y COMPARACIÓN
+# ---------------------------------
+def ejecutar(casos, escalas=ESCALAS, repeticiones=REPETICIONES):
+    resultados = []
+    if "carga" in casos:
+        with tempfile.TemporaryDirectory() as carpeta:
+            for escala in escalas:
+                ruta_csv = datos_sinteticos(escala, carpeta)
+                for compacto, sufijo in ((True, ""), (False, "_sin_compactar")):
+                    resultado = _en_proceso(medir_carga, ruta_csv, repeticiones, compacto)
+                    resultados.append({"caso": f"carga_x{escala}{sufijo}", "tipo": "carga", "escala": escala,
+                                       "compacto": compacto, **resultado})
+                    print(f"   > carga x{escala}{sufijo.replace('_', ' ')}: {resultado['tiempo_s']:.3f} s")
+    for caso in casos:
+        if caso not in SECCIONES:
+            continue
+        pagina, subpagina = SECCIONES[caso]
+        resultado = _en_proceso(medir_seccion, pagina, subpagina, repeticiones)
+        resultados.append({"caso": caso, "tipo": "seccion", "escala": 1, **resultado})
+        print(f"   > {caso}: {resultado['tiempo_s']:.3f} s (primera visita {resultado['primera_visita_s']:.3f} s)")
+
+    for resultado in resultados:
+        resultado["filas_por_s"] = resultado["filas"] / resultado["tiempo_s"] if resultado["tiempo_s"] else None
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": repeticiones,
+        "resultados": resultados,
+    }
+
+
+def comparar(actual, anterior, tolerancia=TOLERANCIA):
+    """
+    Casos cuyo tiempo ha empeorado más de `tolerancia` (0.2 = 20 %)
+    """
+    previos = {r["caso"]: r for r in anterior["resultados"]}
+    regresiones = []
+    for resultado in actual["resultados"]:
+        previo = previos.get(resultado["caso"])
+        if previo and resultado["tiempo_s"] > previo["tiempo_s"] * (1 + tolerancia):
+            regresiones.append((resultado["caso"], previo["tiempo_s"], resultado["tiempo_s"]))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de las secciones del dashboard y de la carga de datos")
+    parser.add_argument("--casos", nargs="+", choices=["carga"] + list(SECCIONES), default=["carga"] + list(SECCIONES))
+    parser.add_argument("--escalas", nargs="+", type=int, default=ESCALAS, help="Múltiplos de la temporada para la carga de datos")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--salida", help="Fichero JSON de resultados (por defecto, en outputs/benchmarks/)")
+    parser.add_argument("--comparar", metavar="JSON", help="Resultados anteriores con los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="Empeoramiento admitido (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args.casos, args.escalas, args.repeticiones)
+    salida = args.salida or os.path.join(CARPETA_BENCHMARKS, f"benchmark_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(salida) or ".", exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+    print(f"   [OK] Resultados guardados en: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(informe, json.load(f), args.tolerancia)
+        for caso, antes, ahora in regresiones:
+            print(f"   [AVISO] {caso}: {antes:.3f} s -> {ahora:.3f} s")
+        if regresiones:
+            sys.exit(1)
+        print("   [OK] Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
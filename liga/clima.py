@@ -0,0 +1,259 @@
+"""
+Enriquecimiento climático de los partidos con la API histórica de Open-Meteo.
+
+El notebook hacía una petición por partido (un solo día) y se quedaba con una
+de las 24 horas devueltas. Aquí los partidos se agrupan por estadio (mismas
+coordenadas) y se pide de una vez todo el rango de fechas de ese estadio, así
+que una temporada pasa de ~380 peticiones a ~20:
+- la serie horaria de cada estadio se guarda en `outputs/clima/<clave>.parquet`
+  y en la siguiente ejecución solo se piden los días que faltan;
+- la hora del pitido inicial de todos los partidos se busca de una vez, con un
+  reindex sobre (estadio, hora) en lugar de indexar fila a fila;
+- el cliente es intercambiable: `ClienteOpenMeteo` usa la API real (y puede
+  grabar las respuestas) y `ClienteGrabado` las reproduce sin conexión.
+
+Ejemplo:
+    cliente = ClienteOpenMeteo()
+    df = enriquecer_clima(pd.read_csv("inputs/hop.txt.csv"), cliente)
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+URL_API = "https://archive-api.open-meteo.com/v1/archive"
+ZONA_HORARIA = "Europe/Madrid"
+CARPETA_CLIMA = "outputs/clima"
+
+# Variable horaria de la API -> columna que se añade al DataFrame de partidos
+VARIABLES_HORARIAS = {
+    "temperature_2m": "Temperatura_C",          # Temp real
+    "apparent_temperature": "Sensacion_Termica_C",  # Sensación
+    "precipitation": "Precipitacion_mm",        # Lluvia
+    "wind_speed_10m": "Viento_kmh",             # Viento
+    "weather_code": "Codigo_Clima",             # Icono/Resumen
+}
+
+
+# ---------------------------------
+# CLIENTES
+# ---------------------------------
+def _parametros(lat, lon, inicio, fin, zona_horaria=ZONA_HORARIA):
+    return {
+        "latitude": float(lat),
+        "longitude": float(lon),
+        "start_date": pd.Timestamp(inicio).strftime("%Y-%m-%d"),
+        "end_date": pd.Timestamp(fin).strftime("%Y-%m-%d"),
+        "hourly": list(VARIABLES_HORARIAS),
+        "timezone": zona_horaria,   # Importante para ajustar la hora
+    }
+
+
+def _clave_peticion(parametros):
+    texto = json.dumps(parametros, sort_keys=True)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+class ClienteOpenMeteo:
+    """
+    Cliente de la API real, con caché de requests y reintentos como en el notebook.
+
+    grabar_en: carpeta opcional donde guardar cada respuesta en JSON para
+               reproducirla después con `ClienteGrabado`.
+    """
+
+    def __init__(self, sesion=None, grabar_en=None, verify=False):
+        import openmeteo_requests
+
+        if sesion is None:
+            import requests_cache
+            from retry_requests import retry
+
+            cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
+            sesion = retry(cache_session, retries=5, backoff_factor=0.2)
+        self._cliente = openmeteo_requests.Client(session=sesion)
+        self.grabar_en = grabar_en
+        self.verify = verify
+        self.peticiones = 0
+
+    def horario(self, lat, lon, inicio, fin, zona_horaria=ZONA_HORARIA):
+        """
+        Devuelve la serie horaria (hora local de `zona_horaria`) de [inicio, fin] en unas coordenadas
+        """
+        parametros = _parametros(lat, lon, inicio, fin, zona_horaria)
+        self.peticiones += 1
+        # verify=False evita errores de SSL en algunas redes wifi
+        hourly = self._cliente.weather_api(URL_API, params=parametros, verify=self.verify)[0].Hourly()
+
+        horas_utc = pd.date_range(
+            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=hourly.Interval()),
+            inclusive="left",
+        )
+        serie = pd.DataFrame({"Hora": horas_utc.tz_convert(zona_horaria).tz_localize(None)})
+        for i, variable in enumerate(VARIABLES_HORARIAS):
+            serie[variable] = hourly.Variables(i).ValuesAsNumpy()
+
+        if self.grabar_en:
+            _grabar_respuesta(self.grabar_en, parametros, serie)
+        return serie
+
+
+class ClienteGrabado:
+    """
+    Reproduce respuestas grabadas (sin conexión). Sirve para probar el
+    enriquecimiento sin depender de la red ni de la cuota de la API.
+    """
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.peticiones = 0
+
+    def horario(self, lat, lon, inicio, fin, zona_horaria=ZONA_HORARIA):
+        parametros = _parametros(lat, lon, inicio, fin, zona_horaria)
+        ruta = os.path.join(self.carpeta, _clave_peticion(parametros) + ".json")
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No hay respuesta grabada para {parametros}")
+        self.peticiones += 1
+        with open(ruta, encoding="utf-8") as f:
+            grabada = json.load(f)
+        serie = pd.DataFrame({"Hora": pd.to_datetime(grabada["hora"])})
+        for variable in VARIABLES_HORARIAS:
+            serie[variable] = np.array(grabada[variable], dtype=np.float32)
+        return serie
+
+
+def _grabar_respuesta(carpeta, parametros, serie):
+    os.makedirs(carpeta, exist_ok=True)
+    grabada = {"parametros": parametros, "hora": serie["Hora"].dt.strftime("%Y-%m-%dT%H:%M").tolist()}
+    for variable in VARIABLES_HORARIAS:
+        grabada[variable] = [None if pd.isna(v) else float(v) for v in serie[variable]]
+    ruta = os.path.join(carpeta, _clave_peticion(parametros) + ".json")
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(grabada, f)
+    os.replace(ruta + ".tmp", ruta)
+
+
+# ---------------------------------
+# ALMACÉN HORARIO POR ESTADIO
+# ---------------------------------
+def clave_estadio(lat, lon):
+    return f"{float(lat):.5f}_{float(lon):.5f}"
+
+
+def _ruta_estadio(carpeta, clave):
+    return os.path.join(carpeta, clave + ".parquet")
+
+
+def leer_horario_estadio(clave, carpeta=CARPETA_CLIMA):
+    ruta = _ruta_estadio(carpeta, clave)
+    if not os.path.exists(ruta):
+        return pd.DataFrame({"Hora": pd.Series(dtype="datetime64[ns]")})
+    return pd.read_parquet(ruta)
+
+
+def _guardar_horario_estadio(clave, serie, carpeta):
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = _ruta_estadio(carpeta, clave)
+    serie.to_parquet(ruta + ".tmp", index=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def _rangos_contiguos(dias):
+    """
+    Agrupa una lista ordenada de días en rangos [inicio, fin] sin huecos
+    """
+    rangos = []
+    for dia in dias:
+        if rangos and dia - rangos[-1][1] == pd.Timedelta(days=1):
+            rangos[-1][1] = dia
+        else:
+            rangos.append([dia, dia])
+    return rangos
+
+
+def actualizar_estadio(cliente, lat, lon, dias, carpeta=CARPETA_CLIMA, rellenar_huecos=True, zona_horaria=ZONA_HORARIA):
+    """
+    Garantiza que el almacén del estadio cubre todos los `dias` pedidos.
+    Los días que faltan se piden en una sola llamada (de la primera a la última
+    fecha que falta); con rellenar_huecos=False se hace una llamada por cada
+    tramo contiguo de días que faltan. Las horas son locales de `zona_horaria`
+    (la de la liga del estadio).
+    Devuelve (serie horaria completa del estadio, número de peticiones hechas).
+    """
+    clave = clave_estadio(lat, lon)
+    serie = leer_horario_estadio(clave, carpeta)
+    dias_guardados = set(serie["Hora"].dt.normalize().unique())
+    faltan = sorted(d for d in set(dias) if d not in dias_guardados)
+    if not faltan:
+        return serie, 0
+
+    rangos = [[faltan[0], faltan[-1]]] if rellenar_huecos else _rangos_contiguos(faltan)
+    nuevas = [cliente.horario(lat, lon, inicio, fin, zona_horaria) for inicio, fin in rangos]
+    serie = pd.concat([serie] + nuevas, ignore_index=True)
+    # En el cambio de hora de octubre la misma hora local aparece dos veces: nos quedamos con la primera
+    serie = serie.drop_duplicates("Hora", keep="first").sort_values("Hora", ignore_index=True)
+    _guardar_horario_estadio(clave, serie, carpeta)
+    return serie, len(rangos)
+
+
+# ---------------------------------
+# ENRIQUECIMIENTO
+# ---------------------------------
+def hora_inicio(df, col_fecha="Date", col_hora="Time"):
+    """
+    Fecha y hora entera del pitido inicial (ej: 18:30 -> 18:00) en hora local
+    """
+    fecha = pd.to_datetime(df[col_fecha], dayfirst=True, errors="coerce")
+    horas = pd.to_numeric(df[col_hora].astype(str).str.split(":").str[0], errors="coerce")
+    return fecha.dt.normalize() + pd.to_timedelta(horas, unit="h")
+
+
+def enriquecer_clima(df, cliente, carpeta=CARPETA_CLIMA, col_lat="Latitud", col_lon="Longitud", zona_horaria=ZONA_HORARIA):
+    """
+    Añade a df las columnas de VARIABLES_HORARIAS con el clima de cada partido
+    a la hora del pitido inicial. Los partidos sin coordenadas, sin fecha o
+    cuyo estadio falla en la API quedan con valores vacíos. `zona_horaria` es
+    la de la hora de los partidos (LIGAS[liga]["zona_horaria"]).
+    """
+    df = df.copy()
+    inicio = hora_inicio(df)
+    validas = df[col_lat].notna() & df[col_lon].notna() & inicio.notna()
+    claves = pd.Series(None, index=df.index, dtype=object)
+    claves[validas] = [clave_estadio(la, lo) for la, lo in zip(df.loc[validas, col_lat], df.loc[validas, col_lon])]
+
+    if (~validas).any():
+        print(f"   [SALTADO] {int((~validas).sum())} partidos sin coordenadas o sin fecha.")
+
+    series = []
+    total_peticiones = 0
+    grupos = df[validas].groupby(claves[validas], sort=False)
+    for i, (clave, grupo) in enumerate(grupos):
+        lat, lon = grupo[col_lat].iloc[0], grupo[col_lon].iloc[0]
+        dias = inicio[grupo.index].dt.normalize().unique()
+        try:
+            serie, peticiones = actualizar_estadio(cliente, lat, lon, dias, carpeta, zona_horaria=zona_horaria)
+        except Exception as e:
+            print(f"   [ERROR] Fallo en estadio {clave}: {e}")
+            continue
+        total_peticiones += peticiones
+        print(f"   > Estadio {i + 1}/{grupos.ngroups} ({clave}): {len(grupo)} partidos, {peticiones} peticiones")
+        series.append(serie.assign(Clave=clave))
+
+    # Búsqueda vectorizada de todas las horas de inicio a la vez
+    columnas = list(VARIABLES_HORARIAS)
+    if series:
+        horario = pd.concat(series, ignore_index=True).set_index(["Clave", "Hora"])[columnas]
+        valores = horario.reindex(pd.MultiIndex.from_arrays([claves, inicio])).to_numpy()
+    else:
+        valores = np.full((len(df), len(columnas)), np.nan)
+
+    for j, variable in enumerate(columnas):
+        df[VARIABLES_HORARIAS[variable]] = valores[:, j]
+
+    print(f"   [INFO] Peticiones a la API: {total_peticiones} (para {int(validas.sum())} partidos)")
+    return df
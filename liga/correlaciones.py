@@ -0,0 +1,164 @@
+"""
+Matriz de correlación de la página de Resumen a partir de estadísticos suficientes.
+
+`df.corr()` recorre todas las filas y columnas numéricas en cada recarga. Aquí
+se guardan, por mes y por equipo, las sumas que bastan para reconstruir la
+correlación de Pearson (con el mismo tratamiento de huecos que pandas, por
+pares de columnas): número de filas, sumas, sumas de cuadrados y productos
+cruzados. Son aditivas, así que para cualquier combinación de equipos y
+fechas de la barra lateral basta con sumar las celdas:
+- sin equipos: sumas acumuladas por mes (una resta por consulta);
+- con equipos: sumas acumuladas por mes de cada equipo (local o visitante),
+  descontando una vez los partidos entre dos equipos seleccionados;
+- solo los meses de los extremos del rango, si no entran completos, se
+  calculan con sus filas.
+
+Los equipos se guardan como ids enteros (liga.nombres), así que buscar los
+partidos de un equipo compara enteros y no textos.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from liga.nombres import EQUIPOS
+
+# Equipos cuyas sumas se mantienen en memoria a la vez (cada uno ocupa ~4·p²·meses floats)
+TAM_CACHE_EQUIPOS = 8
+
+
+def _estadisticas(X):
+    """
+    Sumas por pares de columnas de un bloque de filas (NaN = hueco):
+    [conteo, suma de x_i, suma de x_i², suma de x_i·x_j], cada una p x p y
+    restringida a las filas donde x_i y x_j están presentes
+    """
+    presente = ~np.isnan(X)
+    Z = np.where(presente, X, 0.0)
+    M = presente.astype(float)
+    return np.stack([M.T @ M, Z.T @ M, (Z * Z).T @ M, Z.T @ Z])
+
+
+def _correlacion(estadisticas):
+    n, sx, sxx, sxy = estadisticas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * sxy - sx * sx.T
+        var_i = n * sxx - sx * sx
+        var_j = var_i.T
+        corr = cov / np.sqrt(var_i * var_j)
+    # Como pandas: sin varianza o con menos de 2 filas el resultado es NaN
+    # (la varianza de una columna constante sale ~1e-16 por redondeo, no 0)
+    sin_varianza = var_i <= 1e-12 * n * sxx
+    corr[(n < 2) | sin_varianza | sin_varianza.T] = np.nan
+    corr = np.clip(corr, -1, 1)
+    diagonal = np.diag(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+    return corr
+
+
+class EstadisticasCorrelacion:
+    """
+    Correlación entre columnas numéricas para cualquier filtro de equipos y fechas
+    """
+
+    def __init__(self, df, columnas=None, col_fecha="Date", col_local="Local", col_visitante="Visitante"):
+        numericas = df[columnas] if columnas is not None else df.select_dtypes(include="number")
+        self.columnas = list(numericas.columns)
+        X = numericas.to_numpy(dtype=float)
+        # Centramos con la media global (la correlación no cambia) para no perder precisión en las sumas
+        with np.errstate(invalid="ignore"):
+            media = np.nanmean(X, axis=0) if len(X) else np.zeros(X.shape[1])
+        self._X = X - np.nan_to_num(media)
+        p = len(self.columnas)
+        self._cero = np.zeros((4, p, p))
+
+        # Filas ordenadas por fecha y agrupadas por mes
+        fechas = pd.to_datetime(df[col_fecha]).to_numpy()
+        validas = np.flatnonzero(~np.isnat(fechas))
+        self._orden = validas[np.argsort(fechas[validas], kind="stable")]
+        self._fechas = fechas[self._orden]
+        meses = self._fechas.astype("datetime64[M]")
+        self._meses, self._limites = np.unique(meses, return_index=True)
+        self._limites = np.append(self._limites, len(self._orden))
+
+        self._local = EQUIPOS.ids(df[col_local]).to_numpy()[self._orden]
+        self._visitante = EQUIPOS.ids(df[col_visitante]).to_numpy()[self._orden]
+        # Posiciones (en el orden por fecha) de los partidos de cada equipo como local
+        self._filas_local = {equipo: np.asarray(pos) for equipo, pos in pd.Series(np.arange(len(self._orden))).groupby(self._local).groups.items()}
+
+        # Sumas acumuladas por mes de todos los partidos
+        self._acumulado = self._acumular(np.arange(len(self._orden)))
+        self._por_equipo = OrderedDict()
+
+    def _acumular(self, posiciones):
+        """
+        Sumas acumuladas por mes (índice 0 = ningún mes) de las filas dadas
+        (posiciones en el orden por fecha)
+        """
+        acumulado = np.zeros((len(self._meses) + 1,) + self._cero.shape)
+        cortes = np.searchsorted(posiciones, self._limites)
+        for m in range(len(self._meses)):
+            filas = self._orden[posiciones[cortes[m]:cortes[m + 1]]]
+            acumulado[m + 1] = acumulado[m] + (_estadisticas(self._X[filas]) if len(filas) else 0)
+        return acumulado
+
+    def _acumulado_equipo(self, equipo):
+        if equipo in self._por_equipo:
+            self._por_equipo.move_to_end(equipo)
+            return self._por_equipo[equipo]
+        posiciones = np.flatnonzero((self._local == equipo) | (self._visitante == equipo))
+        acumulado = self._acumular(posiciones)
+        self._por_equipo[equipo] = acumulado
+        if len(self._por_equipo) > TAM_CACHE_EQUIPOS:
+            self._por_equipo.popitem(last=False)
+        return acumulado
+
+    def _rango(self, inicio, fin):
+        """
+        Devuelve (primer mes completo, mes siguiente al último completo, posiciones
+        de las filas del rango que caen en meses incompletos)
+        """
+        a = 0 if inicio is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(inicio)), side="left")
+        b = len(self._fechas) if fin is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(fin)), side="right")
+        b = max(a, b)
+        # Un mes es completo si todas sus filas están dentro de [a, b)
+        m_ini = np.searchsorted(self._limites[:-1], a, side="left")
+        m_fin = np.searchsorted(self._limites[1:], b, side="right")
+        if m_fin <= m_ini:
+            return 0, 0, np.arange(a, b)
+        sueltas = np.concatenate([np.arange(a, self._limites[m_ini]), np.arange(self._limites[m_fin], b)])
+        return m_ini, m_fin, sueltas
+
+    def estadisticas(self, equipos=None, inicio=None, fin=None):
+        m_ini, m_fin, sueltas = self._rango(inicio, fin)
+        if not equipos:
+            total = self._acumulado[m_fin] - self._acumulado[m_ini]
+            return total + (_estadisticas(self._X[self._orden[sueltas]]) if len(sueltas) else 0)
+
+        equipos = set(EQUIPOS.ids(list(equipos)).tolist())
+        total = self._cero.copy()
+        for equipo in equipos:
+            acumulado = self._acumulado_equipo(equipo)
+            total += acumulado[m_fin] - acumulado[m_ini]
+
+        # Los partidos entre dos equipos seleccionados se han sumado dos veces
+        dobles = [pos[np.isin(self._visitante[pos], list(equipos))] for pos in (self._filas_local.get(e, np.empty(0, dtype=int)) for e in equipos)]
+        dobles = np.concatenate(dobles) if dobles else np.empty(0, dtype=int)
+        dobles = dobles[(dobles >= self._limites[m_ini]) & (dobles < self._limites[m_fin])]
+        if len(dobles):
+            total -= _estadisticas(self._X[self._orden[dobles]])
+
+        # Filas de los meses incompletos de los extremos
+        sueltas = sueltas[np.isin(self._local[sueltas], list(equipos)) | np.isin(self._visitante[sueltas], list(equipos))]
+        if len(sueltas):
+            total += _estadisticas(self._X[self._orden[sueltas]])
+        return total
+
+    def correlacion(self, equipos=None, inicio=None, fin=None):
+        """
+        Matriz de correlación (DataFrame) de los partidos en los que juega
+        alguno de `equipos` (todos si está vacío) entre `inicio` y `fin`
+        """
+        corr = _correlacion(self.estadisticas(equipos, inicio, fin))
+        return pd.DataFrame(corr, index=self.columnas, columns=self.columnas)
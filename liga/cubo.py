@@ -0,0 +1,116 @@
+"""
+Cubo de agregados por equipo, estadio, clima y fecha.
+
+Varias páginas del dashboard repiten en cada recarga el mismo groupby sobre
+todas las filas y columnas (por estadio, por equipo local, por clima, por
+fecha...). El cubo guarda una sola vez, por celda de dimensiones, medidas
+aditivas: número de partidos y, para cada medida, su suma y el número de
+valores no vacíos (para poder sacar la media igual que pandas, sin contar los
+huecos). Cualquier vista filtrada se responde sumando celdas:
+
+    cubo = CuboAgregados(df)
+    cubo.consultar(["Local"], ["Goles_Totales", "Asistencia"], equipos_sel, fecha_inicio, fecha_fin)
+
+Las celdas solo tienen las dimensiones y las medidas (no las ~130 columnas
+del CSV); equipos y estadios van como ids enteros (liga.nombres), así que
+agrupar y filtrar compara enteros, y los nombres se recuperan solo en el
+resultado de cada consulta. Al añadir partidos nuevos con `agregar` solo se calculan las
+celdas de esos partidos y se suman a las existentes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from liga.derivadas import calcular_derivadas
+from liga.nombres import EQUIPOS, ESTADIOS, SIN_ID
+
+DIMENSIONES = ["Local_Id", "Visitante_Id", "Estadio_Id", "Latitud", "Longitud", "Codigo_Clima", "Date"]
+# Dimensiones de nombre: se agrupan por su id y se traducen al final
+IDS = {"Local": ("Local_Id", EQUIPOS), "Visitante": ("Visitante_Id", EQUIPOS), "Estadio": ("Estadio_Id", ESTADIOS)}
+MEDIDAS = ["FTHG", "FTAG", "Goles_Totales", "Tarjetas", "Asistencia"]
+
+
+class CuboAgregados:
+    """
+    Agregados aditivos por (equipos, estadio, código de clima, fecha)
+    """
+
+    def __init__(self, df, medidas=MEDIDAS):
+        self.medidas = list(medidas)
+        self.celdas = self._celdas(df)
+        self._ordenar()
+
+    def _celdas(self, df):
+        df = calcular_derivadas(df, [m for m in self.medidas if m not in df.columns])
+        base = pd.DataFrame({id_: resolutor.ids(df[nombre]).to_numpy() for nombre, (id_, resolutor) in IDS.items()}, index=df.index)
+        base[DIMENSIONES[3:]] = df[DIMENSIONES[3:]]
+        base["Date"] = pd.to_datetime(base["Date"])
+        base["Partidos"] = 1
+        for medida in self.medidas:
+            valores = pd.to_numeric(df[medida], errors="coerce")
+            base[f"Suma_{medida}"] = valores.fillna(0).to_numpy(dtype=float)
+            base[f"N_{medida}"] = valores.notna().to_numpy(dtype=np.int64)
+        return self._combinar(base)
+
+    def _combinar(self, celdas):
+        # dropna=False: las celdas con dimensiones vacías (p. ej. sin clima) también cuentan
+        return celdas.groupby(DIMENSIONES, dropna=False, sort=False).sum().reset_index()
+
+    def _ordenar(self):
+        self.celdas = self.celdas.sort_values("Date", kind="stable", ignore_index=True)
+        # Las fechas quedan ordenadas y los NaT al final: los filtros de fecha son búsquedas binarias
+        self._fechas = self.celdas["Date"].dropna().to_numpy()
+
+    def agregar(self, df_nuevos):
+        """
+        Añade partidos nuevos: solo se calculan sus celdas y se suman a las que ya había
+        """
+        nuevas = self._celdas(df_nuevos)
+        celdas = pd.concat([self.celdas, nuevas], ignore_index=True)
+        self.celdas = self._combinar(celdas)
+        self._ordenar()
+
+    def filtrar(self, equipos=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Celdas con los mismos criterios que la barra lateral: juega alguno de
+        `equipos` (local o visitante) y la fecha está en [fecha_inicio, fecha_fin]
+        """
+        inicio = 0 if fecha_inicio is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(fecha_inicio)), side="left")
+        fin = len(self._fechas) if fecha_fin is None else np.searchsorted(self._fechas, np.datetime64(pd.Timestamp(fecha_fin)), side="right")
+        celdas = self.celdas.iloc[inicio:max(inicio, fin)]
+        if equipos:
+            ids = EQUIPOS.ids(list(equipos)).to_numpy()
+            celdas = celdas[celdas["Local_Id"].isin(ids) | celdas["Visitante_Id"].isin(ids)]
+        return celdas
+
+    def consultar(self, por, medidas=(), equipos=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Equivale a df_filt.groupby(por).agg({medida: "mean"}): devuelve una fila
+        por grupo con "Partidos" y la media de cada medida. `por` puede incluir
+        columnas derivadas de las dimensiones (p. ej. "Clima_Completo").
+        """
+        celdas = self.filtrar(equipos, fecha_inicio, fecha_fin)
+        claves = [IDS[c][0] if c in IDS else c for c in por]
+        derivadas = [c for c in claves if c not in celdas.columns]
+        if derivadas:
+            celdas = calcular_derivadas(celdas, derivadas)
+        sumas = ["Partidos"] + [f"Suma_{m}" for m in medidas] + [f"N_{m}" for m in medidas]
+        # Como en pandas, los grupos con clave vacía no aparecen
+        ids = [IDS[c][0] for c in por if c in IDS]
+        if ids:
+            celdas = celdas[(celdas[ids] != SIN_ID).all(axis=1)]
+        grupos = celdas.groupby(claves, sort=True, observed=True)[sumas].sum()
+        resultado = grupos[["Partidos"]].copy()
+        for medida in medidas:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                resultado[medida] = grupos[f"Suma_{medida}"] / grupos[f"N_{medida}"].replace(0, np.nan)
+        resultado = resultado.reset_index()
+        if not ids:
+            return resultado
+        # De ids a nombres, en el mismo orden que si se hubiera agrupado por nombre
+        for nombre in por:
+            if nombre in IDS:
+                id_, resolutor = IDS[nombre]
+                resultado[id_] = resolutor.nombres_de(resultado[id_])
+                resultado = resultado.rename(columns={id_: nombre})
+        return resultado.sort_values(list(por), kind="stable", ignore_index=True)
@@ -0,0 +1,241 @@
+"""
+Columnas derivadas del dashboard.
+
+Cada columna derivada se declara con el decorador `derivada`, indicando de qué
+otras columnas derivadas depende. `calcular_derivadas` añade solo las columnas
+que pide una página (y sus dependencias), todas en forma vectorizada con
+NumPy/pandas: nada de `apply` fila a fila. Las columnas de texto (resultado,
+sorpresa, clima) se devuelven como categorías: pocos valores distintos
+repetidos en todas las filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Umbral de cuota a partir del cual una victoria se considera sorpresa
+UMBRAL_SORPRESA = 4
+
+# Mapeo de códigos WMO simplificados a emojis
+EMOJIS_CLIMA = {
+    0: "☀️",   # Despejado (sin nubes)
+    1: "🌤️",   # Mayormente despejado
+    2: "⛅",   # Parcialmente nublado
+    3: "☁️",   # Nublado
+    45: "🌫️",  # Niebla
+    48: "🌫️",  # Niebla con escarcha
+    51: "🌦️",  # Llovizna ligera
+    53: "🌧️",  # Llovizna moderada
+    55: "🌧️",  # Llovizna densa
+    56: "🌧️",  # Llovizna helada ligera
+    57: "🌧️",  # Llovizna helada densa
+    61: "🌧️",  # Lluvia ligera
+    63: "🌧️",  # Lluvia moderada
+    65: "🌧️",  # Lluvia fuerte
+    66: "🌧️",  # Lluvia helada ligera
+    67: "🌧️",  # Lluvia helada fuerte
+    71: "🌨️",  # Nevada ligera
+    73: "🌨️",  # Nevada moderada
+    75: "❄️",   # Nevada fuerte
+    77: "❄️",   # Nieve granulada
+    80: "🌦️",  # Chubascos de lluvia ligeros
+    81: "🌧️",  # Chubascos de lluvia moderados
+    82: "🌧️",  # Chubascos de lluvia violentos
+    85: "🌨️",  # Chubascos de nieve ligeros
+    86: "❄️",   # Chubascos de nieve fuertes
+    95: "⛈️",   # Tormenta ligera o moderada
+    96: "⛈️",   # Tormenta con granizo ligero
+    99: "⛈️",   # Tormenta con granizo fuerte
+}
+EMOJI_CLIMA_DEFECTO = "🌤️"
+
+# Descripción textual de cada código WMO
+DESCRIPCIONES_CLIMA = {
+    0: "Despejado",
+    1: "Mayormente despejado",
+    2: "Parcialmente nublado",
+    3: "Nublado",
+    45: "Niebla",
+    48: "Niebla con escarcha",
+    51: "Llovizna ligera",
+    53: "Llovizna moderada",
+    55: "Llovizna densa",
+    61: "Lluvia ligera",
+    63: "Lluvia moderada",
+    65: "Lluvia fuerte",
+    71: "Nevada ligera",
+    73: "Nevada moderada",
+    75: "Nevada fuerte",
+    80: "Chubascos ligeros",
+    81: "Chubascos moderados",
+    82: "Chubascos violentos",
+    85: "Chubascos de nieve ligeros",
+    86: "Chubascos de nieve fuertes",
+    95: "Tormenta",
+    96: "Tormenta con granizo ligero",
+    99: "Tormenta con granizo fuerte",
+}
+DESCRIPCION_CLIMA_DEFECTO = "Desconocido"
+
+
+def _tabla_wmo(mapeo, defecto):
+    """
+    Convierte un diccionario {código: texto} en un array indexable por código (0-99)
+    """
+    tabla = np.full(100, defecto, dtype=object)
+    for codigo, valor in mapeo.items():
+        tabla[codigo] = valor
+    return tabla
+
+
+_TABLA_EMOJIS = _tabla_wmo(EMOJIS_CLIMA, EMOJI_CLIMA_DEFECTO)
+_TABLA_DESCRIPCIONES = _tabla_wmo(DESCRIPCIONES_CLIMA, DESCRIPCION_CLIMA_DEFECTO)
+_TABLA_CLIMA_COMPLETO = _TABLA_EMOJIS + " " + _TABLA_DESCRIPCIONES
+
+
+def _buscar_wmo(codigos, tabla, defecto):
+    """
+    Traduce una serie de códigos WMO con una tabla de búsqueda en una sola operación.
+    Los NaN y los códigos fuera de rango reciben el valor por defecto.
+    """
+    valores = pd.to_numeric(codigos, errors="coerce").to_numpy(dtype=float)
+    validos = ~np.isnan(valores) & (valores >= 0) & (valores < len(tabla))
+    indices = np.where(validos, valores, 0).astype(int)
+    return pd.Series(np.where(validos, tabla[indices], defecto), index=codigos.index, dtype="category")
+
+
+def obtener_emoji_clima(codigo_clima):
+    """
+    Retorna un emoji según el código del clima WMO simplificado
+    """
+    if pd.isna(codigo_clima):
+        return EMOJI_CLIMA_DEFECTO
+    return EMOJIS_CLIMA.get(int(codigo_clima), EMOJI_CLIMA_DEFECTO)
+
+
+def obtener_descripcion_clima(codigo_clima):
+    """
+    Retorna descripción textual del clima según el código WMO
+    """
+    if pd.isna(codigo_clima):
+        return DESCRIPCION_CLIMA_DEFECTO
+    return DESCRIPCIONES_CLIMA.get(int(codigo_clima), DESCRIPCION_CLIMA_DEFECTO)
+
+
+# ---------------------------------
+# REGISTRO DE COLUMNAS DERIVADAS
+# ---------------------------------
+# nombre -> (columnas derivadas de las que depende, función df -> Series)
+DERIVADAS = {}
+
+
+def derivada(nombre, requiere=()):
+    """
+    Registra la función decorada como calculadora de la columna `nombre`
+    """
+    def registrar(funcion):
+        DERIVADAS[nombre] = (tuple(requiere), funcion)
+        return funcion
+    return registrar
+
+
+@derivada("Goles_Totales")
+def _goles_totales(df):
+    return df["FTHG"] + df["FTAG"]
+
+
+@derivada("Dif_goles_local")
+def _dif_goles_local(df):
+    return df["FTHG"] - df["FTAG"]
+
+
+@derivada("Over_2_5", requiere=["Goles_Totales"])
+def _over_2_5(df):
+    return df["Goles_Totales"] > 2.5
+
+
+@derivada("Resultado")
+def _resultado(df):
+    return df["FTR"].map({"H": "Gana Local", "D": "Empate", "A": "Gana Visitante"}).astype("category")
+
+
+@derivada("Tarjetas")
+def _tarjetas(df):
+    return df["HY"] + df["AY"] + df["HR"] + df["AR"]
+
+
+@derivada("Goles_Descanso")
+def _goles_descanso(df):
+    return df["HTHG"] + df["HTAG"]
+
+
+@derivada("Tiros_Puerta_Totales")
+def _tiros_puerta_totales(df):
+    return df["HST"] + df["AST"]
+
+
+@derivada("Cuota_Resultado")
+def _cuota_resultado(df):
+    # Elegimos la cuota media del resultado que se dio realmente
+    ftr = df["FTR"].to_numpy()
+    cuotas = np.select([ftr == "H", ftr == "D"], [df["AvgH"].to_numpy(), df["AvgD"].to_numpy()], default=df["AvgA"].to_numpy())
+    return pd.Series(cuotas, index=df.index)
+
+
+@derivada("Sorpresa")
+def _sorpresa(df):
+    ftr = df["FTR"].to_numpy()
+    condiciones = [
+        (ftr == "H") & (df["AvgH"].to_numpy() > UMBRAL_SORPRESA),
+        (ftr == "A") & (df["AvgA"].to_numpy() > UMBRAL_SORPRESA),
+    ]
+    return pd.Series(np.select(condiciones, ["Sorpresa Local", "Sorpresa Visitante"], default="No"), index=df.index, dtype="category")
+
+
+@derivada("Emoji_Clima")
+def _emoji_clima(df):
+    return _buscar_wmo(df["Codigo_Clima"], _TABLA_EMOJIS, EMOJI_CLIMA_DEFECTO)
+
+
+@derivada("Descripcion_Clima")
+def _descripcion_clima(df):
+    return _buscar_wmo(df["Codigo_Clima"], _TABLA_DESCRIPCIONES, DESCRIPCION_CLIMA_DEFECTO)
+
+
+@derivada("Clima_Completo", requiere=["Emoji_Clima", "Descripcion_Clima"])
+def _clima_completo(df):
+    # Misma búsqueda por código con la tabla ya concatenada (sumar categorías no se puede)
+    return _buscar_wmo(df["Codigo_Clima"], _TABLA_CLIMA_COMPLETO, f"{EMOJI_CLIMA_DEFECTO} {DESCRIPCION_CLIMA_DEFECTO}")
+
+
+def _resolver(columnas):
+    """
+    Devuelve las columnas pedidas más sus dependencias, en el orden del registro
+    """
+    pendientes = list(columnas)
+    necesarias = set()
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre in necesarias:
+            continue
+        if nombre not in DERIVADAS:
+            raise KeyError(f"Columna derivada desconocida: {nombre}")
+        necesarias.add(nombre)
+        pendientes.extend(DERIVADAS[nombre][0])
+    return [nombre for nombre in DERIVADAS if nombre in necesarias]
+
+
+def calcular_derivadas(df, columnas=None):
+    """
+    Devuelve una copia de df con las columnas derivadas pedidas (None = todas).
+    Las que ya existen en df no se recalculan. La copia es superficial: las
+    columnas originales se comparten con df (que puede ser el DataFrame
+    compartido por todas las sesiones) y solo se añaden las nuevas.
+    """
+    nombres = _resolver(DERIVADAS if columnas is None else columnas)
+    faltan = [nombre for nombre in nombres if nombre not in df.columns]
+    if not faltan:
+        return df
+    df = df.copy(deep=False)
+    for nombre in faltan:
+        df[nombre] = DERIVADAS[nombre][1](df)
+    return df
@@ -0,0 +1,182 @@
+"""
+Descargador HTTP concurrente con caché en disco.
+
+Sustituye a las descargas una a una con `urlopen`/`requests.get` del notebook
+de ingesta (PASO 2 y PASO 5):
+- las peticiones se lanzan concurrentemente con asyncio sobre una única
+  `requests.Session`, que reutiliza las conexiones (pool por host);
+- hay un límite de peticiones simultáneas por host y un intervalo mínimo
+  entre peticiones al mismo host, para ser "educados" con Wikipedia;
+- cada respuesta se guarda en disco con su ETag/Last-Modified; en la siguiente
+  ejecución se pide de forma condicional y, si la página no ha cambiado, el
+  servidor responde 304 sin cuerpo y se usa la copia local;
+- en modo offline no se toca la red: se leen las respuestas de la carpeta de
+  caché (que sirve también como carpeta de fixtures para pruebas).
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CARPETA_CACHE_HTTP = ".cache_http"
+
+HEADERS_REQUEST = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+@dataclass
+class Respuesta:
+    url: str
+    estado: int              # 200 = descargada, 304 = sin cambios (copia local), 0 = error
+    texto: str = None
+    desde_cache: bool = False
+    error: str = None
+
+
+class Descargador:
+    """
+    Descarga URLs concurrentemente respetando límites por host y con revalidación.
+
+    limite_por_host: peticiones simultáneas máximas a un mismo host.
+    intervalo_min: segundos mínimos entre el inicio de dos peticiones al mismo host.
+    offline: si es True, solo se sirven respuestas guardadas en `carpeta_cache`.
+    """
+
+    def __init__(self, carpeta_cache=CARPETA_CACHE_HTTP, limite_por_host=4, intervalo_min=0.1,
+                 timeout=30, offline=False, headers=None):
+        self.carpeta_cache = carpeta_cache
+        self.limite_por_host = limite_por_host
+        self.intervalo_min = intervalo_min
+        self.timeout = timeout
+        self.offline = offline
+        self.headers = dict(headers or HEADERS_REQUEST)
+        self._sesion = None
+        self._pool = None
+
+    # ---------------------------------
+    # CACHÉ EN DISCO
+    # ---------------------------------
+    def _rutas(self, url):
+        clave = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.carpeta_cache, clave)
+        return base + ".html", base + ".json"
+
+    def leer_cache(self, url):
+        """
+        Devuelve (texto, metadatos) guardados para la URL, o (None, None)
+        """
+        ruta_cuerpo, ruta_meta = self._rutas(url)
+        if not (os.path.exists(ruta_cuerpo) and os.path.exists(ruta_meta)):
+            return None, None
+        with open(ruta_meta, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(ruta_cuerpo, encoding="utf-8") as f:
+            return f.read(), meta
+
+    def guardar_cache(self, url, texto, etag=None, last_modified=None):
+        os.makedirs(self.carpeta_cache, exist_ok=True)
+        ruta_cuerpo, ruta_meta = self._rutas(url)
+        with open(ruta_cuerpo + ".tmp", "w", encoding="utf-8") as f:
+            f.write(texto)
+        os.replace(ruta_cuerpo + ".tmp", ruta_cuerpo)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fecha": time.time()}
+        with open(ruta_meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(ruta_meta + ".tmp", ruta_meta)
+
+    # ---------------------------------
+    # DESCARGA
+    # ---------------------------------
+    def _crear_sesion(self, n_hosts):
+        sesion = requests.Session()
+        sesion.headers.update(self.headers)
+        adaptador = HTTPAdapter(pool_connections=max(n_hosts, 1), pool_maxsize=self.limite_por_host)
+        sesion.mount("http://", adaptador)
+        sesion.mount("https://", adaptador)
+        return sesion
+
+    def _get(self, url, cabeceras):
+        return self._sesion.get(url, headers=cabeceras, timeout=self.timeout)
+
+    async def _descargar_una(self, url, semaforos, ultimos, cerrojos):
+        texto_cache, meta = self.leer_cache(url)
+        if self.offline:
+            if texto_cache is None:
+                return Respuesta(url, 0, error="Sin copia local (modo offline)")
+            return Respuesta(url, 304, texto_cache, desde_cache=True)
+
+        cabeceras = {}
+        if meta:
+            if meta.get("etag"):
+                cabeceras["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                cabeceras["If-Modified-Since"] = meta["last_modified"]
+
+        host = urlparse(url).netloc
+        async with semaforos[host]:
+            # Respetamos el intervalo mínimo entre peticiones al mismo host
+            async with cerrojos[host]:
+                espera = ultimos.get(host, 0) + self.intervalo_min - time.monotonic()
+                if espera > 0:
+                    await asyncio.sleep(espera)
+                ultimos[host] = time.monotonic()
+            try:
+                resp = await asyncio.get_running_loop().run_in_executor(self._pool, self._get, url, cabeceras)
+            except requests.RequestException as e:
+                if texto_cache is not None:
+                    return Respuesta(url, 304, texto_cache, desde_cache=True, error=str(e))
+                return Respuesta(url, 0, error=str(e))
+
+        if resp.status_code == 304 and texto_cache is not None:
+            return Respuesta(url, 304, texto_cache, desde_cache=True)
+        if resp.status_code != 200:
+            return Respuesta(url, 0, error=f"HTTP {resp.status_code}")
+
+        self.guardar_cache(url, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return Respuesta(url, 200, resp.text)
+
+    async def descargar_async(self, urls):
+        """
+        Descarga todas las URLs concurrentemente; devuelve {url: Respuesta}
+        """
+        urls = list(dict.fromkeys(urls))
+        hosts = {urlparse(u).netloc for u in urls}
+        semaforos = {h: asyncio.Semaphore(self.limite_por_host) for h in hosts}
+        cerrojos = {h: asyncio.Lock() for h in hosts}
+        ultimos = {}
+        self._sesion = self._crear_sesion(len(hosts))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, self.limite_por_host * len(hosts)))
+        try:
+            respuestas = await asyncio.gather(*(self._descargar_una(u, semaforos, ultimos, cerrojos) for u in urls))
+        finally:
+            self._pool.shutdown(wait=False)
+            self._sesion.close()
+        return dict(zip(urls, respuestas))
+
+    def descargar(self, urls):
+        """
+        Versión síncrona de `descargar_async` (funciona también dentro de Jupyter)
+        """
+        return ejecutar(self.descargar_async(urls))
+
+
+def ejecutar(corrutina):
+    """
+    Ejecuta una corrutina desde código síncrono. En Jupyter ya hay un bucle de
+    eventos en marcha, así que en ese caso se ejecuta en un hilo aparte.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(corrutina)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, corrutina).result()
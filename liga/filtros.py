@@ -0,0 +1,99 @@
+"""
+Índice precalculado para los filtros de la barra lateral.
+
+Se construye una vez por conjunto de datos y convierte cualquier combinación
+de equipos seleccionados y rango de fechas en una selección de filas:
+- un bitmap (bits empaquetados) por equipo como local y otro como visitante,
+  indexado por el id entero del equipo (liga.nombres);
+- las fechas ordenadas, para resolver el rango con dos búsquedas binarias.
+
+Si no hay equipos seleccionados y las filas ya están en orden cronológico, la
+selección es un `slice` y la página recibe una vista del DataFrame sin copiar.
+"""
+
+import numpy as np
+import pandas as pd
+
+from liga.nombres import EQUIPOS, SIN_ID
+
+FILAS_BLOQUE_BITS = 1 << 16   # filas por bloque al construir los bitmaps
+
+
+class IndiceFiltros:
+    """
+    Índice de filas por equipo (local/visitante) y por fecha
+    """
+
+    def __init__(self, df, col_local="Local", col_visitante="Visitante", col_fecha="Date"):
+        self.n_filas = len(df)
+        ids_local = EQUIPOS.ids(df[col_local]).to_numpy()
+        ids_visitante = EQUIPOS.ids(df[col_visitante]).to_numpy()
+        presentes = np.setdiff1d(np.union1d(ids_local, ids_visitante), [SIN_ID])
+        self.equipos = sorted(EQUIPOS.nombres_de(presentes))
+
+        # Bitmaps: fila i de la matriz = filas en las que juega el equipo con id i
+        self._n_ids = int(presentes.max()) + 1 if len(presentes) else 0
+        self._bits_local = self._bitmaps(ids_local)
+        self._bits_visitante = self._bitmaps(ids_visitante)
+
+        # Fechas ordenadas (los NaT se quedan fuera del índice, igual que con `between`)
+        fechas = pd.to_datetime(df[col_fecha]).to_numpy()
+        validas = np.flatnonzero(~np.isnat(fechas))
+        orden = validas[np.argsort(fechas[validas], kind="stable")]
+        self._orden = orden
+        self._fechas_ordenadas = fechas[orden]
+        self._cronologico = len(orden) == self.n_filas and bool(np.all(orden == np.arange(self.n_filas)))
+
+    def _bitmaps(self, codigos):
+        # Los bits se escriben directamente en la matriz empaquetada (mismo orden
+        # que np.packbits), sin pasar por una matriz de booleanos ids x filas;
+        # por bloques de filas para que los temporales no crezcan con los datos
+        bits = np.zeros((self._n_ids, (self.n_filas + 7) // 8), dtype=np.uint8)
+        for inicio in range(0, self.n_filas, FILAS_BLOQUE_BITS):
+            bloque = codigos[inicio:inicio + FILAS_BLOQUE_BITS]
+            filas = np.flatnonzero(bloque != SIN_ID)
+            posiciones = filas + inicio
+            np.bitwise_or.at(bits, (bloque[filas], posiciones >> 3), np.right_shift(0x80, posiciones & 7).astype(np.uint8))
+        return bits
+
+    def rango_fechas(self):
+        if len(self._fechas_ordenadas) == 0:
+            return None, None
+        return pd.Timestamp(self._fechas_ordenadas[0]), pd.Timestamp(self._fechas_ordenadas[-1])
+
+    def seleccionar(self, equipos_sel=None, fecha_inicio=None, fecha_fin=None):
+        """
+        Devuelve las filas (posiciones) que cumplen el filtro, en orden original.
+        Es un `slice` cuando la selección es contigua, o un array de posiciones.
+        """
+        inicio = 0
+        fin = len(self._fechas_ordenadas)
+        if fecha_inicio is not None:
+            inicio = np.searchsorted(self._fechas_ordenadas, np.datetime64(pd.Timestamp(fecha_inicio)), side="left")
+        if fecha_fin is not None:
+            fin = np.searchsorted(self._fechas_ordenadas, np.datetime64(pd.Timestamp(fecha_fin)), side="right")
+
+        if not equipos_sel:
+            if self._cronologico:
+                return slice(int(inicio), int(max(inicio, fin)))
+            return np.sort(self._orden[inicio:fin])
+
+        ids = EQUIPOS.ids(list(equipos_sel)).to_numpy()
+        ids = ids[(ids != SIN_ID) & (ids < self._n_ids)]
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        bits = np.bitwise_or.reduce(self._bits_local[ids], axis=0) | np.bitwise_or.reduce(self._bits_visitante[ids], axis=0)
+        mascara_equipos = np.unpackbits(bits, count=self.n_filas).astype(bool)
+
+        mascara_fechas = np.zeros(self.n_filas, dtype=bool)
+        mascara_fechas[self._orden[inicio:fin]] = True
+        return np.flatnonzero(mascara_equipos & mascara_fechas)
+
+    @staticmethod
+    def vista(df, filas):
+        """
+        Aplica una selección de filas a df (sin copiar cuando es un `slice`)
+        """
+        if isinstance(filas, slice):
+            return df.iloc[filas]
+        return df.take(filas)
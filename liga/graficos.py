@@ -0,0 +1,178 @@
+"""
+Gráficos de dispersión y de distribución que no crecen con el número de filas.
+
+`px.scatter` y `px.violin(..., points="all")` meten todas las filas en el JSON
+que se envía al navegador. Con una temporada (380 partidos) da igual, pero con
+varias temporadas la página pesa megas y el navegador tarda en pintarla. Estas
+funciones reciben los mismos argumentos que las de plotly express y eligen la
+forma de dibujar según el número de puntos:
+- hasta UMBRAL_SVG: el gráfico de siempre;
+- dispersión hasta UMBRAL_DENSIDAD: el mismo gráfico en WebGL (Scattergl);
+- por encima: un mapa de densidad (histograma 2D calculado aquí, con un
+  número fijo de celdas) y, si se pidió, la recta de tendencia;
+- violines y cajas por encima de UMBRAL_SVG: la densidad (KDE sobre una
+  rejilla fija) y los cuartiles se calculan aquí y solo se envía el resumen.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from liga.instrumentacion import medido
+
+UMBRAL_SVG = 2000
+UMBRAL_DENSIDAD = 20000
+CELDAS_DENSIDAD = 60    # celdas por eje del mapa de densidad
+PUNTOS_KDE = 100        # puntos de la rejilla de cada violín
+
+COLORES = px.colors.qualitative.Plotly
+
+
+def _etiqueta(columna, labels):
+    return (labels or {}).get(columna, columna)
+
+
+def _bordes(valores, celdas):
+    """
+    Bordes de los intervalos de un eje. Si los valores son enteros y caben, un
+    intervalo por entero (goles, tarjetas...) para no dejar franjas vacías.
+    """
+    minimo, maximo = valores.min(), valores.max()
+    if np.all(valores == np.round(valores)) and maximo - minimo < celdas:
+        return np.arange(minimo - 0.5, maximo + 1.5)
+    if maximo == minimo:
+        return np.array([minimo - 0.5, maximo + 0.5])
+    return np.linspace(minimo, maximo, celdas + 1)
+
+
+# ---------------------------------
+# DISPERSIÓN
+# ---------------------------------
+@medido("figura")
+def dispersion(df, x, y, **kwargs):
+    """
+    Igual que px.scatter(df, x=x, y=y, **kwargs), cambiando a WebGL o a mapa
+    de densidad cuando hay muchas filas
+    """
+    if len(df) <= UMBRAL_SVG:
+        return px.scatter(df, x=x, y=y, **kwargs)
+    if len(df) <= UMBRAL_DENSIDAD:
+        return px.scatter(df, x=x, y=y, render_mode="webgl", **kwargs)
+    return densidad(df, x, y, title=kwargs.get("title"), labels=kwargs.get("labels"),
+                    tendencia=kwargs.get("trendline") is not None)
+
+
+def densidad(df, x, y, title=None, labels=None, tendencia=False, celdas=CELDAS_DENSIDAD):
+    """
+    Mapa de densidad (número de partidos por celda) calculado en el servidor
+    """
+    datos = df[[x, y]].apply(pd.to_numeric, errors="coerce").dropna()
+    vx, vy = datos[x].to_numpy(dtype=float), datos[y].to_numpy(dtype=float)
+    fig = go.Figure()
+    if len(datos):
+        bordes_x, bordes_y = _bordes(vx, celdas), _bordes(vy, celdas)
+        conteos, _, _ = np.histogram2d(vx, vy, bins=[bordes_x, bordes_y])
+        fig.add_trace(go.Heatmap(
+            x=(bordes_x[:-1] + bordes_x[1:]) / 2, y=(bordes_y[:-1] + bordes_y[1:]) / 2,
+            z=np.where(conteos.T > 0, conteos.T, np.nan), colorscale="Blues",
+            colorbar={"title": "Partidos"}, hovertemplate="%{x}, %{y}: %{z} partidos<extra></extra>",
+        ))
+        if tendencia and len(np.unique(vx)) > 1:
+            pendiente, ordenada = np.polyfit(vx, vy, 1)
+            extremos = np.array([vx.min(), vx.max()])
+            fig.add_trace(go.Scatter(x=extremos, y=pendiente * extremos + ordenada, mode="lines",
+                                     name="Tendencia (OLS)", line={"color": "firebrick"}))
+    fig.update_layout(title=title, xaxis_title=_etiqueta(x, labels), yaxis_title=_etiqueta(y, labels))
+    return fig
+
+
+# ---------------------------------
+# DISTRIBUCIONES POR CATEGORÍA
+# ---------------------------------
+def _grupos(df, x, y):
+    """
+    Valores de y por categoría de x, en el orden de aparición (como plotly express)
+    """
+    valores = pd.to_numeric(df[y], errors="coerce")
+    if x is None:
+        return [(None, valores.dropna().to_numpy(dtype=float))]
+    return [(categoria, valores[df[x] == categoria].dropna().to_numpy(dtype=float))
+            for categoria in pd.unique(df[x].dropna())]
+
+
+def resumen_caja(valores):
+    """
+    Cuartiles y bigotes (1.5·IQR, hasta el último dato dentro) como los calcula plotly
+    """
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    return {
+        "q1": q1, "median": mediana, "q3": q3,
+        "lowerfence": valores[valores >= q1 - 1.5 * iqr].min(),
+        "upperfence": valores[valores <= q3 + 1.5 * iqr].max(),
+    }
+
+
+def kde(valores, puntos=PUNTOS_KDE):
+    """
+    Densidad gaussiana (ancho de banda de la regla de Silverman) sobre una rejilla de `puntos`,
+    calculada con los datos agrupados en la rejilla: el coste es lineal en filas
+    """
+    desviacion = valores.std()
+    ancho = 1.06 * desviacion * len(valores) ** (-1 / 5) if desviacion > 0 else 0.5
+    rejilla = np.linspace(valores.min() - 3 * ancho, valores.max() + 3 * ancho, puntos)
+    paso = rejilla[1] - rejilla[0]
+    conteos, _ = np.histogram(valores, bins=np.append(rejilla - paso / 2, rejilla[-1] + paso / 2))
+    desplazamientos = np.arange(-puntos + 1, puntos) * paso
+    nucleo = np.exp(-0.5 * (desplazamientos / ancho) ** 2)
+    densidades = np.convolve(conteos, nucleo)[puntos - 1:2 * puntos - 1]
+    return rejilla, densidades / (len(valores) * ancho * np.sqrt(2 * np.pi))
+
+
+def _eje_categorias(fig, categorias, x, y, labels, title):
+    fig.update_layout(
+        title=title, showlegend=False,
+        xaxis={"title": _etiqueta(x, labels) if x else None, "tickvals": list(range(len(categorias))),
+               "ticktext": [str(c) for c in categorias] if x else [""]},
+        yaxis_title=_etiqueta(y, labels),
+    )
+    return fig
+
+
+@medido("figura")
+def violin(df, x, y, title=None, labels=None):
+    """
+    Como px.violin(df, x=x, y=y, box=True, points="all"); con muchas filas se
+    envía la densidad y la caja ya calculadas en lugar de los puntos
+    """
+    if len(df) <= UMBRAL_SVG:
+        return px.violin(df, x=x, y=y, box=True, points="all", title=title, labels=labels)
+    fig = go.Figure()
+    grupos = [(c, v) for c, v in _grupos(df, x, y) if len(v)]
+    for i, (categoria, valores) in enumerate(grupos):
+        color = COLORES[i % len(COLORES)]
+        rejilla, densidades = kde(valores)
+        mitad = 0.4 * densidades / densidades.max()
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([i - mitad, (i + mitad)[::-1]]), y=np.concatenate([rejilla, rejilla[::-1]]),
+            fill="toself", mode="lines", line={"color": color, "width": 1}, name=str(categoria), hoverinfo="skip",
+        ))
+        fig.add_trace(go.Box(x=[i], width=0.08, marker_color=color, name=str(categoria),
+                             **{k: [v] for k, v in resumen_caja(valores).items()}))
+    return _eje_categorias(fig, [c for c, _ in grupos], x, y, labels, title)
+
+
+@medido("figura")
+def caja(df, x, y, title=None, labels=None):
+    """
+    Como px.box(df, x=x, y=y); con muchas filas solo se envían los cuartiles
+    """
+    if len(df) <= UMBRAL_SVG:
+        return px.box(df, x=x, y=y, title=title, labels=labels)
+    fig = go.Figure()
+    grupos = [(c, v) for c, v in _grupos(df, x, y) if len(v)]
+    for i, (categoria, valores) in enumerate(grupos):
+        fig.add_trace(go.Box(x=[i], name=str(categoria), marker_color=COLORES[0], boxpoints=False,
+                             **{k: [v] for k, v in resumen_caja(valores).items()}))
+    return _eje_categorias(fig, [c for c, _ in grupos], x, y, labels, title)
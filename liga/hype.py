@@ -0,0 +1,330 @@
+"""
+Recogida del "hype" de cada partido en Google Trends.
+
+`obtener_hype_google` del notebook hacía una petición por partido (2 equipos)
+seguida de una pausa fija de 5-10 s, y si Google respondía 429 el partido se
+quedaba con 0. Aquí:
+- los partidos se agrupan por jornada (días de partido consecutivos) y se pide
+  una única ventana que cubre la de 7 días de todos sus partidos; la ventana
+  de cada partido se recorta después de esa serie diaria;
+- cada petición lleva hasta 4 equipos más un término ancla fijo (Trends
+  admite 5 términos y escala cada petición a 0-100 por separado); cada serie
+  se reescala por el máximo del ancla en su petición, así que los valores de
+  peticiones distintas son comparables. Los dos equipos de un partido van
+  siempre en la misma petición;
+- las peticiones pasan por un `Planificador`: cubo de tokens para el ritmo y
+  espera exponencial (con jitter) cuando hay 429;
+- el progreso se guarda en JSON tras cada petición, así que una ejecución
+  interrumpida continúa donde se quedó; lo que no se pudo consultar queda
+  vacío (NaN) y pendiente, no a 0.
+
+El cliente es intercambiable: `ClientePytrends` usa Google Trends y
+`ClienteSimulado` imita su comportamiento (normalización por petición y 429
+aleatorios) para probar sin conexión.
+"""
+
+import json
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from liga.modelos import huella_datos
+
+CARPETA_HYPE = "outputs/hype"
+RUTA_ESTADO_HYPE = os.path.join(CARPETA_HYPE, "estado.json")
+MAX_EQUIPOS_PETICION = 5
+ANCLA_HYPE = "fútbol"  # término fijo presente en todas las peticiones (LIGAS[liga]["ancla_trends"])
+DIAS_VENTANA = 3   # días antes y después del partido
+
+
+class LimiteExcedido(Exception):
+    """
+    Google ha respondido 429 (Too Many Requests)
+    """
+
+
+# ---------------------------------
+# CLIENTES
+# ---------------------------------
+class ClientePytrends:
+    """
+    Consulta Google Trends con pytrends en el país `geo` (LIGAS[liga]["geo_trends"]), idioma español
+    """
+
+    def __init__(self, hl='es-ES', tz=360, geo='ES'):
+        from pytrends.request import TrendReq
+
+        self._pytrends = TrendReq(hl=hl, tz=tz)
+        self.geo = geo
+
+    def interes(self, equipos, inicio, fin):
+        """
+        Devuelve un DataFrame diario (índice = fecha) con una columna por equipo
+        """
+        from pytrends.exceptions import ResponseError
+
+        timeframe = f"{inicio:%Y-%m-%d} {fin:%Y-%m-%d}"
+        try:
+            self._pytrends.build_payload(list(equipos), cat=0, timeframe=timeframe, geo=self.geo, gprop='')
+            data = self._pytrends.interest_over_time()
+        except ResponseError as e:
+            if getattr(e.response, "status_code", None) == 429 or "429" in str(e):
+                raise LimiteExcedido(str(e)) from e
+            raise
+        return data.drop(columns="isPartial", errors="ignore")
+
+
+class ClienteSimulado:
+    """
+    Imita Google Trends sin conexión: series diarias deterministas por equipo,
+    normalizadas a 100 dentro de cada petición, y un 429 con probabilidad
+    `prob_429`. Lleva la cuenta de las peticiones recibidas.
+    """
+
+    def __init__(self, prob_429=0.0, semilla=0):
+        self.prob_429 = prob_429
+        self._azar = random.Random(semilla)
+        self.peticiones = 0
+        self.bloqueos = 0
+
+    def interes(self, equipos, inicio, fin):
+        self.peticiones += 1
+        if len(equipos) > MAX_EQUIPOS_PETICION:
+            raise ValueError("Google Trends admite como máximo 5 términos por petición")
+        if self._azar.random() < self.prob_429:
+            self.bloqueos += 1
+            raise LimiteExcedido("The request failed: Google returned a response with code 429")
+        fechas = pd.date_range(inicio, fin, freq="D")
+        datos = {}
+        for equipo in equipos:
+            base = sum(map(ord, equipo)) % 40 + 10
+            datos[equipo] = base + 5 * np.sin(fechas.dayofyear.to_numpy() + len(equipo))
+        data = pd.DataFrame(datos, index=fechas)
+        return (data / data.to_numpy().max() * 100).round()
+
+
+# ---------------------------------
+# PLANIFICADOR (CUBO DE TOKENS + ESPERA EXPONENCIAL)
+# ---------------------------------
+class Planificador:
+    """
+    Controla el ritmo de las peticiones.
+
+    tasa: tokens por segundo (peticiones sostenidas por segundo).
+    capacidad: peticiones que se pueden hacer seguidas sin esperar.
+    Cuando la petición lanza LimiteExcedido se vacía el cubo y se espera
+    espera_base * 2^intento (+ jitter), hasta `max_reintentos` veces.
+    """
+
+    def __init__(self, tasa=1 / 6, capacidad=2, espera_base=30, espera_max=600, max_reintentos=5,
+                 dormir=time.sleep, reloj=time.monotonic, semilla=None):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.espera_base = espera_base
+        self.espera_max = espera_max
+        self.max_reintentos = max_reintentos
+        self._dormir = dormir
+        self._reloj = reloj
+        self._azar = random.Random(semilla)
+        self._tokens = capacidad
+        self._ultimo = reloj()
+
+    def _tomar_token(self):
+        ahora = self._reloj()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+        if self._tokens < 1:
+            espera = (1 - self._tokens) / self.tasa
+            self._dormir(espera)
+            self._ultimo = self._reloj()
+            self._tokens = 1
+        self._tokens -= 1
+
+    def ejecutar(self, funcion, *args):
+        """
+        Llama a funcion(*args) respetando el ritmo; relanza LimiteExcedido si
+        se agotan los reintentos
+        """
+        for intento in range(self.max_reintentos + 1):
+            self._tomar_token()
+            try:
+                return funcion(*args)
+            except LimiteExcedido:
+                if intento == self.max_reintentos:
+                    raise
+                espera = min(self.espera_max, self.espera_base * 2 ** intento)
+                espera += self._azar.uniform(0, espera / 2)
+                print(f"   [ALERTA] Bloqueo de Google (429). Reintento {intento + 1} en {espera:.0f} s...")
+                self._tokens = 0
+                self._dormir(espera)
+
+
+# ---------------------------------
+# PLAN DE CONSULTAS
+# ---------------------------------
+def agrupar_jornadas(fechas, max_hueco=1):
+    """
+    Asigna a cada fecha el número de su jornada: fechas separadas por
+    `max_hueco` días o menos pertenecen a la misma jornada
+    """
+    fechas = pd.Series(pd.to_datetime(fechas)).dt.normalize()
+    unicas = np.sort(fechas.dropna().unique())
+    huecos = np.diff(unicas) > np.timedelta64(max_hueco, "D")
+    jornada_por_fecha = dict(zip(unicas, np.concatenate([[0], np.cumsum(huecos)])))
+    return fechas.map(jornada_por_fecha)
+
+
+def planificar_consultas(df, col_local="Local", col_visitante="Visitante", col_fecha="Date",
+                         max_equipos=MAX_EQUIPOS_PETICION, dias_ventana=DIAS_VENTANA, ancla=ANCLA_HYPE):
+    """
+    Devuelve la lista de consultas [{clave, equipos, inicio, fin}] necesarias
+    para cubrir la ventana de todos los partidos de df. Cada consulta lleva el
+    término `ancla` y hasta max_equipos - 1 equipos, con los dos equipos de
+    cada partido juntos.
+    """
+    fechas = pd.to_datetime(df[col_fecha], dayfirst=True, errors="coerce").dt.normalize()
+    jornadas = agrupar_jornadas(fechas)
+    consultas = []
+
+    def anadir(grupo, inicio, fin):
+        grupo = sorted(grupo)
+        clave = f"{inicio:%Y-%m-%d}_{fin:%Y-%m-%d}_{ancla}|{'|'.join(grupo)}"
+        consultas.append({"clave": clave, "equipos": grupo, "ancla": ancla, "inicio": inicio, "fin": fin})
+
+    for _, idx in fechas.groupby(jornadas).groups.items():
+        inicio = fechas[idx].min() - pd.Timedelta(days=dias_ventana)
+        fin = fechas[idx].max() + pd.Timedelta(days=dias_ventana)
+        partidos = sorted(zip(df.loc[idx, col_local].str.strip(), df.loc[idx, col_visitante].str.strip()))
+        grupo = set()
+        for local, visitante in partidos:
+            if len(grupo | {local, visitante}) > max_equipos - 1:
+                anadir(grupo, inicio, fin)
+                grupo = set()
+            grupo |= {local, visitante}
+        if grupo:
+            anadir(grupo, inicio, fin)
+    return consultas
+
+
+def _reescalar(guardada, ancla):
+    """
+    Series de los equipos de una consulta en la escala común (máximo del ancla = 100)
+    """
+    valores_ancla = guardada.get(ancla, {}).values()
+    maximo_ancla = max(valores_ancla, default=0.0)
+    series = {}
+    for equipo, valores in guardada.items():
+        if equipo == ancla:
+            continue
+        serie = pd.Series(valores, dtype=float)
+        serie.index = pd.to_datetime(serie.index)
+        # Si el ancla no tiene datos la petición entera viene a 0: no hay nada que reescalar
+        series[equipo] = serie * 100 / maximo_ancla if maximo_ancla > 0 else serie
+    return series
+
+
+# ---------------------------------
+# ESTADO PERSISTENTE
+# ---------------------------------
+def _leer_estado(ruta, huella):
+    if ruta and os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            estado = json.load(f)
+        if estado.get("huella") == huella:
+            return estado
+    return {"huella": huella, "consultas": {}}
+
+
+def _guardar_estado(ruta, estado):
+    if not ruta:
+        return
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+# ---------------------------------
+# RECOGIDA
+# ---------------------------------
+def recoger_hype(df, cliente, planificador=None, ruta_estado=RUTA_ESTADO_HYPE,
+                 col_local="Local", col_visitante="Visitante", col_fecha="Date", ancla=ANCLA_HYPE):
+    """
+    Devuelve una Serie (mismo índice que df) con el hype bruto de cada partido:
+    media del máximo de interés de cada equipo en los 7 días alrededor del
+    partido, en la escala del término ancla. Los partidos cuya consulta no se pudo completar quedan en NaN y
+    se vuelven a intentar en la siguiente ejecución.
+    """
+    planificador = planificador or Planificador()
+    consultas = planificar_consultas(df, col_local, col_visitante, col_fecha, ancla=ancla)
+    # Cada consulta se guarda por su clave (ventana y equipos), así que el estado
+    # sirve aunque df cambie (una jornada nueva solo añade consultas); solo se
+    # descarta si cambian los parámetros de la ventana
+    huella = huella_datos(parametros={"dias_ventana": DIAS_VENTANA, "max_equipos": MAX_EQUIPOS_PETICION, "ancla": ancla})
+    estado = _leer_estado(ruta_estado, huella)
+
+    pendientes = [c for c in consultas if c["clave"] not in estado["consultas"]]
+    print(f"   [INFO] {len(consultas)} consultas ({len(consultas) - len(pendientes)} ya guardadas) para {len(df)} partidos")
+
+    for i, consulta in enumerate(pendientes):
+        try:
+            terminos = consulta["equipos"] + [consulta["ancla"]]
+            data = planificador.ejecutar(cliente.interes, terminos, consulta["inicio"], consulta["fin"])
+        except LimiteExcedido:
+            print("   [ALERTA] Google sigue bloqueando. Se guarda el progreso; vuelve a ejecutar más tarde.")
+            break
+        except Exception as e:
+            print(f"   [ERROR] Consulta {consulta['clave']}: {e}")
+            continue
+        estado["consultas"][consulta["clave"]] = {
+            equipo: {f"{fecha:%Y-%m-%d}": float(v) for fecha, v in data[equipo].items()} if equipo in data.columns else {}
+            for equipo in terminos
+        }
+        _guardar_estado(ruta_estado, estado)
+        if (i + 1) % 5 == 0:
+            print(f"   > {i + 1}/{len(pendientes)} consultas ({consulta['inicio']:%Y-%m-%d})")
+
+    # Serie diaria de cada (jornada, equipo) a partir de las consultas guardadas
+    series = {}
+    for consulta in consultas:
+        guardada = estado["consultas"].get(consulta["clave"])
+        if guardada is None:
+            continue
+        for equipo, serie in _reescalar(guardada, consulta["ancla"]).items():
+            series[(consulta["inicio"], equipo)] = serie
+
+    fechas = pd.to_datetime(df[col_fecha], dayfirst=True, errors="coerce").dt.normalize()
+    jornadas = agrupar_jornadas(fechas)
+    inicio_jornada = fechas.groupby(jornadas).transform("min") - pd.Timedelta(days=DIAS_VENTANA)
+    ventana = pd.Timedelta(days=DIAS_VENTANA)
+
+    def maximo(inicio, equipo, fecha):
+        serie = series.get((inicio, equipo))
+        if serie is None:
+            return np.nan
+        # Una serie vacía significa que Google no tenía datos: 0, como en el notebook
+        return serie.loc[fecha - ventana:fecha + ventana].max() if len(serie) else 0.0
+
+    hypes = [
+        (maximo(ini, local.strip(), fecha) + maximo(ini, visitante.strip(), fecha)) / 2
+        if pd.notna(fecha) else np.nan
+        for ini, local, visitante, fecha in zip(inicio_jornada, df[col_local], df[col_visitante], fechas)
+    ]
+    resultado = pd.Series(hypes, index=df.index, dtype=float)
+    if resultado.isna().any():
+        print(f"   [AVISO] {int(resultado.isna().sum())} partidos pendientes (sin datos todavía)")
+    return resultado
+
+
+def normalizar_hype(hypes):
+    """
+    Normalización Min-Max global al rango 0-100 (los NaN se mantienen)
+    """
+    hypes = pd.Series(hypes, dtype=float)
+    minimo, maximo = hypes.min(), hypes.max()
+    if not maximo > minimo:
+        return hypes
+    return (hypes - minimo) / (maximo - minimo) * 100
@@ -0,0 +1,126 @@
+"""
+Intervalos de predicción del Random Forest a partir de la variabilidad entre árboles.
+
+En lugar de construir la matriz completa árboles x partidos para luego sacar
+la media y la desviación, las predicciones de cada árbol se van acumulando en
+una media y varianza corrientes (algoritmo de Welford). Los árboles se reparten
+entre hilos (la predicción de sklearn libera el GIL) y los acumuladores de cada
+hilo se combinan al final. Los partidos se procesan por bloques, así que la
+memoria no crece con el número de árboles.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+import pandas as pd
+
+from liga.instrumentacion import medido
+
+TAM_BLOQUE = 4096
+
+
+class AcumuladorWelford:
+    """
+    Media y varianza corrientes (por fila) de una secuencia de vectores de predicción
+    """
+
+    def __init__(self, n_filas):
+        self.n = 0
+        self.media = np.zeros(n_filas)
+        self.m2 = np.zeros(n_filas)
+
+    def agregar(self, valores):
+        self.n += 1
+        delta = valores - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valores - self.media)
+
+    def combinar(self, otro):
+        """
+        Une dos acumuladores (fórmula de Chan para varianzas en paralelo)
+        """
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = otro.n, otro.media.copy(), otro.m2.copy()
+            return self
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media = self.media + delta * otro.n / n
+        self.m2 = self.m2 + otro.m2 + delta ** 2 * self.n * otro.n / n
+        self.n = n
+        return self
+
+    def varianza(self):
+        # ddof=0, igual que np.std por defecto
+        return self.m2 / max(self.n, 1)
+
+
+def _acumular_arboles(arboles, X_bloque, guardar):
+    """
+    Predice un bloque de filas con un subconjunto de árboles.
+    Si `guardar` es True devuelve también las predicciones (para los cuantiles).
+    """
+    acumulador = AcumuladorWelford(X_bloque.shape[0])
+    predicciones = [] if guardar else None
+    for arbol in arboles:
+        # check_input=False: X_bloque ya es float32 contiguo, como espera el árbol
+        pred = arbol.predict(X_bloque, check_input=False)
+        acumulador.agregar(pred)
+        if guardar:
+            predicciones.append(pred)
+    return acumulador, predicciones
+
+
+@medido("modelo", modelo="asistencia", operacion="intervalos")
+def intervalos_bosque(rf, X, z=2.0, cuantiles=None, n_hilos=None, tam_bloque=TAM_BLOQUE):
+    """
+    Calcula la predicción media, la desviación entre árboles y el intervalo
+    media ± z·std para cada fila de X.
+
+    cuantiles: lista opcional de cuantiles (p. ej. [0.025, 0.975]) calculados
+               exactamente dentro de cada bloque de filas.
+    Devuelve un DataFrame con las columnas media, std, inferior, superior
+    (y q_<cuantil> si se piden), con el mismo índice que X.
+    """
+    indice = X.index if isinstance(X, pd.DataFrame) else pd.RangeIndex(len(X))
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    arboles = list(rf.estimators_)
+    n_hilos = min(n_hilos or os.cpu_count() or 1, len(arboles))
+    # Repartimos los árboles entre los hilos
+    grupos = [arboles[i::n_hilos] for i in range(n_hilos)]
+    guardar = bool(cuantiles)
+
+    medias, desviaciones, filas_cuantiles = [], [], []
+    with ThreadPoolExecutor(max_workers=n_hilos) as pool:
+        for inicio in range(0, X.shape[0], tam_bloque):
+            X_bloque = X[inicio:inicio + tam_bloque]
+            resultados = list(pool.map(lambda grupo: _acumular_arboles(grupo, X_bloque, guardar), grupos))
+
+            total = AcumuladorWelford(X_bloque.shape[0])
+            for acumulador, _ in resultados:
+                total.combinar(acumulador)
+            medias.append(total.media)
+            desviaciones.append(np.sqrt(total.varianza()))
+
+            if guardar:
+                # Solo se guarda la matriz de este bloque, nunca la de todas las filas
+                matriz = np.vstack([p for _, preds in resultados for p in preds])
+                filas_cuantiles.append(np.quantile(matriz, cuantiles, axis=0).T)
+
+    media = np.concatenate(medias) if medias else np.empty(0)
+    std = np.concatenate(desviaciones) if desviaciones else np.empty(0)
+    resultado = pd.DataFrame({
+        "media": media,
+        "std": std,
+        "inferior": media - z * std,
+        "superior": media + z * std,
+    }, index=indice)
+
+    if guardar:
+        valores = np.vstack(filas_cuantiles) if filas_cuantiles else np.empty((0, len(cuantiles)))
+        for j, q in enumerate(cuantiles):
+            resultado[f"q_{q}"] = valores[:, j]
+
+    return resultado
@@ -0,0 +1,123 @@
+"""
+Actualización incremental por jornadas.
+
+Durante la temporada solo cambia una jornada por semana, pero rehacer todo
+vuelve a pedir el clima y Google Trends de los 380 partidos. Aquí cada
+partido se identifica por (fecha, local, visitante) y cada etapa guarda en
+`outputs/incremental/estado.json`:
+- la huella de los datos de entrada de cada partido que ya procesó, para
+  detectar los partidos nuevos y los que han cambiado (una asistencia
+  corregida, un partido aplazado que cambia de fecha...);
+- su marca de agua: la última fecha de partido procesada;
+- lo que haga falta para no recalcular los demás (el hype bruto).
+
+Las salidas se preparan en ficheros temporales y se publican juntas al final
+(`Publicacion`); el estado se guarda después, así que si algo falla a mitad
+la siguiente ejecución repite el trabajo en lugar de darlo por hecho.
+"""
+
+import filecmp
+import json
+import os
+
+import pandas as pd
+
+from liga.union import clave_normalizada
+
+CARPETA_INCREMENTAL = "outputs/incremental"
+RUTA_ESTADO_INCREMENTAL = os.path.join(CARPETA_INCREMENTAL, "estado.json")
+
+
+# ---------------------------------
+# CLAVES Y HUELLAS
+# ---------------------------------
+def clave_partido(df, col_fecha="Date", col_local="Local", col_visitante="Visitante"):
+    """
+    Clave de cada partido: "AAAA-MM-DD|local|visitante" (nombres normalizados)
+    """
+    fecha = pd.to_datetime(df[col_fecha], dayfirst=True, errors="coerce").dt.strftime("%Y-%m-%d").fillna("")
+    return fecha + "|" + clave_normalizada(df[col_local]) + "|" + clave_normalizada(df[col_visitante])
+
+
+def huellas_filas(df):
+    """
+    Huella (hash) del contenido de cada fila, como texto para guardarla en JSON
+    """
+    return pd.util.hash_pandas_object(df, index=False).astype(str)
+
+
+def filas_pendientes(claves, huellas, estado_etapa):
+    """
+    Máscara de los partidos nuevos o cuya huella no coincide con la guardada
+    """
+    guardadas = estado_etapa.get("huellas", {})
+    return pd.Series([guardadas.get(c) != h for c, h in zip(claves, huellas)], index=claves.index)
+
+
+def anotar_etapa(estado, etapa, claves, huellas, fechas, **extra):
+    """
+    Guarda en el estado las huellas de todos los partidos vigentes y la marca de agua
+    """
+    fechas = pd.to_datetime(fechas, dayfirst=True, errors="coerce")
+    estado[etapa] = {
+        "marca": f"{fechas.max():%Y-%m-%d}" if fechas.notna().any() else None,
+        "huellas": dict(zip(claves, huellas)),
+        **extra,
+    }
+
+
+def leer_estado(ruta=RUTA_ESTADO_INCREMENTAL):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_estado(estado, ruta=RUTA_ESTADO_INCREMENTAL):
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(ruta + ".tmp", ruta)
+
+
+# ---------------------------------
+# PUBLICACIÓN
+# ---------------------------------
+class Publicacion:
+    """
+    Salidas preparadas en temporales (`<ruta>.nuevo`) que se publican juntas.
+    Las etapas siguientes leen la versión preparada con leer(ruta).
+    """
+
+    def __init__(self):
+        self.pendientes = {}
+
+    def temporal(self, ruta):
+        self.pendientes[ruta] = ruta + ".nuevo"
+        return self.pendientes[ruta]
+
+    def leer(self, ruta):
+        return self.pendientes.get(ruta, ruta)
+
+    def publicar(self):
+        """
+        Sustituye cada salida por su temporal (os.replace es atómico). Si el
+        contenido no ha cambiado no se toca, para no cambiar su fecha de
+        modificación y que el almacén no se reconstruya sin motivo.
+        Devuelve las rutas publicadas.
+        """
+        publicadas = []
+        for ruta, temporal in self.pendientes.items():
+            if os.path.exists(ruta) and filecmp.cmp(ruta, temporal, shallow=False):
+                os.remove(temporal)
+                continue
+            os.replace(temporal, ruta)
+            publicadas.append(ruta)
+        self.pendientes = {}
+        return publicadas
+
+    def descartar(self):
+        for temporal in self.pendientes.values():
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        self.pendientes = {}
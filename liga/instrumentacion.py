@@ -0,0 +1,194 @@
+"""
+Instrumentación opcional del dashboard: tiempo y memoria por sección y por paso.
+
+Desactivada por defecto (no cuesta nada). Se activa con variables de entorno:
+    LIGA_INSTRUMENTACION=1                  mide y muestra un panel plegado en la barra lateral
+    LIGA_INSTRUMENTACION_JSONL=ruta.jsonl   añade cada medida como una línea JSON
+    LIGA_INSTRUMENTACION_PROM=ruta.prom     reescribe los agregados en formato de texto de
+                                            Prometheus (para el textfile collector de node_exporter)
+
+Cada paso se mide con `medir`, como bloque `with` o con iniciar()/terminar():
+    with medir("figura", nombre="tiros_goles"):
+        fig = px.scatter(...)
+y `instrumentar` envuelve funciones ya existentes (st.plotly_chart, px.scatter...)
+sin tocar sus llamadas. Para la memoria se usa tracemalloc: el pico de un paso
+es lo máximo que se llegó a reservar por encima de lo que había al empezar
+(tracemalloc es global al proceso, así que con varias sesiones a la vez las
+reservas de una pueden aparecer en otra).
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+ACTIVA = os.environ.get("LIGA_INSTRUMENTACION") == "1"
+RUTA_JSONL = os.environ.get("LIGA_INSTRUMENTACION_JSONL")
+RUTA_PROMETHEUS = os.environ.get("LIGA_INSTRUMENTACION_PROM")
+MEDIDAS_RECIENTES = 200
+
+if ACTIVA and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+class Registro:
+    """
+    Agregados por (paso, etiquetas) y últimas medidas, compartidos por todas las sesiones
+    """
+
+    def __init__(self, recientes=MEDIDAS_RECIENTES):
+        self._cerrojo = threading.Lock()
+        self.agregados = {}
+        self.recientes = deque(maxlen=recientes)
+
+    def anotar(self, medida):
+        clave = (medida["paso"], tuple(sorted(medida["etiquetas"].items())))
+        with self._cerrojo:
+            agregado = self.agregados.setdefault(clave, {"llamadas": 0, "segundos": 0.0, "segundos_max": 0.0, "memoria_pico_bytes": 0})
+            agregado["llamadas"] += 1
+            agregado["segundos"] += medida["segundos"]
+            agregado["segundos_max"] = max(agregado["segundos_max"], medida["segundos"])
+            agregado["memoria_pico_bytes"] = max(agregado["memoria_pico_bytes"], medida["memoria_pico_bytes"])
+            self.recientes.append(medida)
+            if RUTA_JSONL:
+                with open(RUTA_JSONL, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(medida, ensure_ascii=False) + "\n")
+
+    def tabla_recientes(self):
+        """
+        Últimas medidas como lista de filas planas (la más reciente primero)
+        """
+        with self._cerrojo:
+            medidas = list(self.recientes)
+        return [
+            {"instante": m["instante"], "paso": m["paso"], **m["etiquetas"], "segundos": round(m["segundos"], 4),
+             "memoria_pico_kb": round(m["memoria_pico_bytes"] / 1024, 1), "memoria_neta_kb": round(m["memoria_neta_bytes"] / 1024, 1)}
+            for m in reversed(medidas)
+        ]
+
+    def texto_prometheus(self):
+        metricas = [
+            ("liga_paso_llamadas_total", "counter", "Veces que se ha ejecutado el paso", "llamadas"),
+            ("liga_paso_segundos_total", "counter", "Tiempo acumulado del paso en segundos", "segundos"),
+            ("liga_paso_segundos_max", "gauge", "Tiempo máximo de una ejecución del paso en segundos", "segundos_max"),
+            ("liga_paso_memoria_pico_bytes", "gauge", "Pico de memoria (tracemalloc) de una ejecución del paso", "memoria_pico_bytes"),
+        ]
+        with self._cerrojo:
+            agregados = {clave: dict(valor) for clave, valor in self.agregados.items()}
+        lineas = []
+        for nombre, tipo, ayuda, campo in metricas:
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+            for (paso, etiquetas), agregado in sorted(agregados.items()):
+                texto = ",".join(f'{k}="{_escapar(v)}"' for k, v in (("paso", paso),) + etiquetas)
+                lineas.append(f"{nombre}{{{texto}}} {agregado[campo]}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar_prometheus(self, ruta=None):
+        ruta = ruta or RUTA_PROMETHEUS
+        if not ruta:
+            return
+        # Escritura atómica: el collector nunca lee un fichero a medias
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.texto_prometheus())
+        os.replace(ruta + ".tmp", ruta)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registro = Registro()
+_pila = threading.local()
+
+
+class Medida:
+    """
+    Mide tiempo y memoria de un paso. Se pueden anidar: el pico de la medida
+    exterior incluye el de sus pasos internos.
+    """
+
+    def __init__(self, paso, **etiquetas):
+        self.paso = paso
+        self.etiquetas = {k: str(v) for k, v in etiquetas.items()}
+
+    def iniciar(self):
+        if not ACTIVA:
+            return self
+        pila = _pila.__dict__.setdefault("medidas", [])
+        if pila:
+            pila[-1]._pico = max(pila[-1]._pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+        self._pico = self._memoria_inicial
+        pila.append(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def terminar(self):
+        if not ACTIVA or not hasattr(self, "_inicio"):
+            return
+        segundos = time.perf_counter() - self._inicio
+        actual, pico = tracemalloc.get_traced_memory()
+        self._pico = max(self._pico, pico)
+        pila = _pila.medidas
+        pila.remove(self)
+        if pila:
+            pila[-1]._pico = max(pila[-1]._pico, self._pico)
+        tracemalloc.reset_peak()
+        registro.anotar({
+            "instante": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "paso": self.paso,
+            "etiquetas": self.etiquetas,
+            "segundos": segundos,
+            "memoria_pico_bytes": self._pico - self._memoria_inicial,
+            "memoria_neta_bytes": actual - self._memoria_inicial,
+        })
+        del self._inicio
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *excepcion):
+        self.terminar()
+        return False
+
+
+def medir(paso, **etiquetas):
+    return Medida(paso, **etiquetas)
+
+
+def envolver(llamable, paso, **etiquetas):
+    """
+    Devuelve `llamable` medido como `paso` (o el mismo si está desactivada)
+    """
+    if not ACTIVA or getattr(llamable, "_instrumentada", False):
+        return llamable
+
+    @functools.wraps(llamable)
+    def medida(*args, **kwargs):
+        with Medida(paso, **etiquetas):
+            return llamable(*args, **kwargs)
+
+    medida._instrumentada = True
+    return medida
+
+
+def instrumentar(objeto, nombres, paso):
+    """
+    Sustituye objeto.<nombre> por su versión medida (paso=`paso`, funcion=<nombre>)
+    """
+    for nombre in nombres:
+        if hasattr(objeto, nombre):
+            setattr(objeto, nombre, envolver(getattr(objeto, nombre), paso, funcion=nombre))
+
+
+def medido(paso, **etiquetas):
+    """
+    Decorador equivalente a envolver(f, paso, funcion=<nombre de f>, **etiquetas)
+    """
+    def decorador(funcion):
+        return envolver(funcion, paso, funcion=funcion.__name__, **etiquetas)
+    return decorador
@@ -0,0 +1,50 @@
+"""
+Ligas y temporadas.
+
+Los datos se guardan particionados por liga (código de football-data.co.uk:
+SP1, E0, I1...) y por temporada ("2024-25"). La temporada de un partido se
+deduce de su fecha: las ligas europeas empiezan en verano, así que un partido
+de julio o posterior es de la temporada que empieza ese año.
+"""
+
+import pandas as pd
+
+LIGA_POR_DEFECTO = "SP1"
+MES_INICIO_TEMPORADA = 7
+SIN_FECHA = "sin-fecha"
+
+# zona_horaria: la de la hora de los partidos (clima); geo_trends y
+# ancla_trends: país y término ancla de las consultas de Google Trends (hype)
+LIGAS = {
+    "SP1": {"nombre": "La Liga", "pais": "España", "zona_horaria": "Europe/Madrid", "geo_trends": "ES", "ancla_trends": "fútbol"},
+    "SP2": {"nombre": "Segunda División", "pais": "España", "zona_horaria": "Europe/Madrid", "geo_trends": "ES", "ancla_trends": "fútbol"},
+    "E0": {"nombre": "Premier League", "pais": "Inglaterra", "zona_horaria": "Europe/London", "geo_trends": "GB", "ancla_trends": "football"},
+    "I1": {"nombre": "Serie A", "pais": "Italia", "zona_horaria": "Europe/Rome", "geo_trends": "IT", "ancla_trends": "calcio"},
+    "D1": {"nombre": "Bundesliga", "pais": "Alemania", "zona_horaria": "Europe/Berlin", "geo_trends": "DE", "ancla_trends": "Fußball"},
+    "F1": {"nombre": "Ligue 1", "pais": "Francia", "zona_horaria": "Europe/Paris", "geo_trends": "FR", "ancla_trends": "football"},
+}
+
+
+def nombre_liga(liga):
+    """
+    Nombre legible de una liga (el propio código si no está en LIGAS)
+    """
+    return LIGAS.get(liga, {}).get("nombre", liga)
+
+
+def datos_liga(liga):
+    """
+    Datos de una liga de LIGAS; las ligas que no están usan los de la liga por defecto
+    """
+    return {**LIGAS[LIGA_POR_DEFECTO], **LIGAS.get(liga, {"nombre": liga, "pais": ""})}
+
+
+def temporada_de(fechas):
+    """
+    Serie con la temporada ("2024-25") de cada fecha; las fechas vacías van a SIN_FECHA
+    """
+    fechas = pd.to_datetime(pd.Series(fechas), dayfirst=True, errors="coerce")
+    inicio = fechas.dt.year - (fechas.dt.month < MES_INICIO_TEMPORADA)
+    temporadas = inicio.astype("Int64").astype(str) + "-" + ((inicio + 1) % 100).astype("Int64").astype(str).str.zfill(2)
+    return temporadas.where(fechas.notna(), SIN_FECHA)
+
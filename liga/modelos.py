@@ -0,0 +1,332 @@
+"""
+Registro de modelos entrenados.
+
+Entrenar la regresión logística y el Random Forest en cada visita a la página
+de predicción satura la CPU. Aquí cada modelo se entrena una sola vez por
+combinación de (datos, hiperparámetros): la huella de ambos forma parte del
+nombre del fichero joblib, así que si cambian los datos se entrena una versión
+nueva y las antiguas se eliminan.
+
+Las variables de cada modelo (variables_resultado, variables_asistencia) se
+construyen aquí para que el dashboard y la puntuación de partidos futuros
+(liga.puntuacion) usen exactamente las mismas. Los ids enteros de equipos y
+estadios del modelo de asistencia salen de una tabla (ids_asistencia) que se
+guarda en el artefacto, así que no dependen del proceso que puntúa.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from liga.instrumentacion import medir
+from liga.nombres import SIN_ID
+
+CARPETA_MODELOS = "outputs/modelos"
+
+# Información que no se conoce antes del partido o que contiene el resultado
+COLUMNAS_POSTERIORES = [
+    'FTR', 'FTHG', 'FTAG',  # Resultado final
+    'HTHG', 'HTAG', 'HTR',  # Información al descanso
+    'HS', 'AS', 'HST', 'AST',  # Estadísticas del partido
+    'HC', 'AC', 'HF', 'AF',
+    'HO', 'AO', 'HY', 'AY',
+    'HR', 'AR', 'HBP', 'ABP',
+    'Asistencia', 'Referee',  # Información posterior al partido
+]
+
+# Hiperparámetros de cada modelo (los mismos que en predicciones.ipynb)
+PARAMETROS_RESULTADO = {"test_size": 0.2, "random_state": 42, "max_iter": 1000}
+PARAMETROS_ASISTENCIA = {"test_size": 0.25, "random_state": 42, "n_estimators": 100}
+
+# Un cerrojo por fichero para que dos sesiones no entrenen el mismo modelo a la vez
+_cerrojos = {}
+_cerrojo_global = threading.Lock()
+
+
+def huella_datos(*objetos, parametros=None):
+    """
+    Calcula una huella (hash) del contenido de los DataFrames/Series y de los parámetros
+    """
+    h = hashlib.sha256()
+    for obj in objetos:
+        if isinstance(obj, pd.DataFrame):
+            h.update(json.dumps(list(map(str, obj.columns))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    h.update(json.dumps(parametros or {}, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+def nombre_modelo(tipo, liga, temporadas):
+    """
+    Nombre en el registro del modelo `tipo` ("resultado"/"asistencia")
+    entrenado con una liga y unas temporadas: cada selección tiene sus
+    propios ficheros, así que cambiar de temporadas no borra los de otra
+    """
+    return f"{tipo}_{liga}_{'+'.join(sorted(temporadas))}"
+
+
+def _fecha_modificacion(ruta):
+    # Otra sesión puede haber borrado el fichero entre glob() y la consulta
+    try:
+        return os.path.getmtime(ruta)
+    except OSError:
+        return -1.0
+
+
+def _versiones(nombre, carpeta):
+    return glob.glob(os.path.join(carpeta, f"{glob.escape(nombre)}-*.joblib"))
+
+
+def ruta_modelo(nombre, carpeta=CARPETA_MODELOS):
+    """
+    Versión más reciente del modelo `nombre` en el registro (None si no hay ninguna)
+    """
+    rutas = _versiones(nombre, carpeta)
+    return max(rutas, key=_fecha_modificacion) if rutas else None
+
+
+def cargar_modelo(nombre, carpeta=CARPETA_MODELOS, intentos=3):
+    """
+    Carga la versión más reciente del modelo `nombre` (None si no hay
+    ninguna). Si otra sesión la sustituye por una nueva mientras se lee, se
+    vuelve a buscar.
+    """
+    for _ in range(intentos):
+        ruta = ruta_modelo(nombre, carpeta)
+        if ruta is None:
+            return None
+        try:
+            return joblib.load(ruta)
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(f"El modelo {nombre} ha cambiado en {carpeta} mientras se cargaba")
+
+
+def temporadas_modelo(tipo, liga, carpeta=CARPETA_MODELOS):
+    """
+    Selecciones de temporadas con un modelo `tipo` de la liga en el registro
+    """
+    prefijo = f"{tipo}_{liga}_"
+    nombres = {os.path.basename(r).rsplit("-", 1)[0] for r in glob.glob(os.path.join(carpeta, f"{glob.escape(prefijo)}*.joblib"))}
+    return sorted(tuple(n[len(prefijo):].split("+")) for n in nombres)
+
+
+def _cerrojo(ruta):
+    with _cerrojo_global:
+        return _cerrojos.setdefault(ruta, threading.Lock())
+
+
+def _purgar_versiones(nombre, ruta_vigente, carpeta):
+    """
+    Elimina del disco las versiones de un modelo anteriores a la vigente
+    (nunca una más reciente, que puede haber escrito otro proceso)
+    """
+    vigente = _fecha_modificacion(ruta_vigente)
+    for ruta in _versiones(nombre, carpeta):
+        if os.path.abspath(ruta) != os.path.abspath(ruta_vigente) and _fecha_modificacion(ruta) < vigente:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+def modelo_en_cache(nombre, X, y, entrenar, parametros, carpeta=CARPETA_MODELOS):
+    """
+    Devuelve el artefacto del modelo `nombre` para los datos (X, y).
+
+    Si ya existe en disco un artefacto con la misma huella se carga; si no,
+    se entrena con entrenar(X, y, **parametros) y se guarda con joblib. Las
+    versiones antiguas del mismo modelo se eliminan solo después de cargar o
+    guardar la vigente. `nombre` incluye la selección de datos (nombre_modelo).
+    """
+    huella = huella_datos(X, y, parametros=parametros)
+    ruta = os.path.join(carpeta, f"{nombre}-{huella}.joblib")
+
+    with _cerrojo(ruta):
+        if os.path.exists(ruta):
+            artefacto = joblib.load(ruta)
+        else:
+            artefacto = entrenar(X, y, **parametros)
+            artefacto["huella"] = huella
+
+            os.makedirs(carpeta, exist_ok=True)
+            ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+            joblib.dump(artefacto, ruta_tmp)
+            os.replace(ruta_tmp, ruta)
+        _purgar_versiones(nombre, ruta, carpeta)
+
+    return artefacto
+
+
+def variables_resultado(df):
+    """
+    Variables del modelo de resultados: todo lo que se conoce antes del
+    partido salvo fecha, hora y estadio, con los equipos como categóricas
+    """
+    descartar = COLUMNAS_POSTERIORES + ["Date", "Time", "Estadio"]
+    X = df.drop(columns=[c for c in descartar if c in df.columns])
+    return X.astype({"Local": "category", "Visitante": "category"})
+
+
+def ids_asistencia(df):
+    """
+    Tabla de ids del modelo de asistencia: los equipos y estadios de los
+    partidos de entrenamiento (nombres canónicos) en orden alfabético
+    """
+    equipos = pd.concat([df["Local"], df["Visitante"]]).dropna().unique()
+    return {"equipos": sorted(equipos), "estadios": sorted(df["Estadio"].dropna().unique())}
+
+
+def _codificar(serie, nombres):
+    # Posición de cada nombre en la tabla (SIN_ID si no está o está vacío)
+    codigos = pd.Categorical(serie, categories=nombres).codes
+    return pd.Series(np.where(codigos < 0, SIN_ID, codigos).astype(np.int16), index=serie.index)
+
+
+def variables_asistencia(df, ids=None):
+    """
+    Variables del modelo de asistencia: lo que se conoce antes del partido,
+    día de la semana, mes, fin de semana e ids enteros de equipos y estadio.
+    Los ids salen de la tabla `ids` guardada con el modelo (ids_asistencia
+    de los propios partidos si no se indica); los equipos y estadios que no
+    están en ella quedan como SIN_ID.
+    """
+    ids = ids if ids is not None else ids_asistencia(df)
+    fechas = pd.to_datetime(df["Date"], dayfirst=True)
+    X = df.assign(
+        Dia_Semana_Num=fechas.dt.weekday,
+        Mes_Num=fechas.dt.month,
+        Finde=fechas.dt.weekday.isin([5, 6]).astype(int),
+        Local_Num=_codificar(df["Local"], ids["equipos"]),
+        Visitante_Num=_codificar(df["Visitante"], ids["equipos"]),
+        Estadio_Num=_codificar(df["Estadio"], ids["estadios"]),
+    )
+    descartar = COLUMNAS_POSTERIORES + ["Date", "Time", "Estadio", "Local", "Visitante"]
+    return X.drop(columns=[c for c in descartar if c in X.columns])
+
+
+def preprocesado_resultado(X):
+    """
+    Escalado de las columnas numéricas y one-hot disperso de las categóricas
+    (los equipos). La salida es una matriz dispersa: los dummies nunca se
+    convierten en columnas densas, por muchos equipos que haya.
+    """
+    categoricas = [c for c in X.columns if isinstance(X[c].dtype, pd.CategoricalDtype)]
+    numericas = [c for c in X.columns if c not in categoricas]
+    # El one-hot también se escala (sin centrar, para no densificarlo), como
+    # se hacía con los dummies de get_dummies: la regularización no cambia
+    one_hot = make_pipeline(
+        OneHotEncoder(categories=[list(X[c].cat.categories) for c in categoricas], handle_unknown="ignore"),
+        StandardScaler(with_mean=False),
+    )
+    return ColumnTransformer(
+        [("numericas", StandardScaler(), numericas), ("equipos", one_hot, categoricas)],
+        sparse_threshold=1.0, verbose_feature_names_out=False,
+    )
+
+
+def entrenar_resultado(X, y, test_size=0.2, random_state=42, max_iter=1000):
+    """
+    Entrena la regresión logística de resultados (H/D/A). X lleva los equipos
+    como columnas categóricas y el resto numérico; el modelo se ajusta
+    directamente sobre la matriz dispersa del preprocesado.
+    Devuelve el modelo, el preprocesado y las predicciones sobre el conjunto de prueba.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    preprocesado = preprocesado_resultado(X)
+    X_train_scaled = preprocesado.fit_transform(X_train)
+    X_test_scaled = preprocesado.transform(X_test)
+
+    modelo = LogisticRegression(max_iter=max_iter, random_state=random_state)
+    with medir("modelo", modelo="resultado", operacion="fit"):
+        modelo.fit(X_train_scaled, y_train)
+
+    with medir("modelo", modelo="resultado", operacion="predict"):
+        y_pred = modelo.predict(X_test_scaled)
+        y_proba = modelo.predict_proba(X_test_scaled)
+
+    return {
+        "modelo": modelo,
+        "preprocesado": preprocesado,
+        "columnas": list(preprocesado.get_feature_names_out()),
+        "y_test": y_test,
+        "y_pred": y_pred,
+        "y_proba": y_proba,
+    }
+
+
+class ImputacionPorGrupo:
+    """
+    Rellena los huecos de las columnas numéricas con la media de su grupo
+    (por defecto, el equipo local) y, si el grupo no tiene ningún dato, con
+    la media global de la columna ya rellenada.
+
+    Las medias se calculan en fit() con un solo groupby().mean() para todas
+    las columnas y se aplican por alineación de índices, sin funciones
+    Python por grupo. Se guardan con el modelo, así que un partido nuevo se
+    imputa con las medias del entrenamiento.
+    """
+
+    def __init__(self, grupo="Local_Num", columnas=None):
+        self.grupo = grupo
+        self.columnas = columnas
+
+    def _por_grupo(self, X):
+        # Media del grupo de cada fila (NaN si el grupo no estaba en fit)
+        return self.medias_grupo_.reindex(X[self.grupo].to_numpy()).set_axis(X.index)
+
+    def fit(self, X, y=None):
+        self.columnas_ = self.columnas or X.select_dtypes(include=["int64", "float64"]).columns.drop(self.grupo, errors="ignore").tolist()
+        self.medias_grupo_ = X.groupby(self.grupo)[self.columnas_].mean()
+        self.medias_ = X[self.columnas_].fillna(self._por_grupo(X)).mean()
+        return self
+
+    def transform(self, X):
+        X = X.copy()
+        X[self.columnas_] = X[self.columnas_].fillna(self._por_grupo(X)).fillna(self.medias_)
+        return X
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+
+def entrenar_asistencia(X, y, test_size=0.25, random_state=42, n_estimators=100, ids=None):
+    """
+    Entrena el Random Forest de asistencia. Los huecos de X se rellenan con
+    ImputacionPorGrupo, ajustada sobre todos los partidos como en el notebook.
+    Devuelve el modelo, la imputación, la tabla de ids con la que se
+    construyó X (ids_asistencia), el conjunto de prueba y sus predicciones.
+    """
+    imputacion = ImputacionPorGrupo()
+    X = imputacion.fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+    rf = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, n_jobs=-1)
+    with medir("modelo", modelo="asistencia", operacion="fit"):
+        rf.fit(X_train, y_train)
+
+    with medir("modelo", modelo="asistencia", operacion="predict"):
+        y_pred = rf.predict(X_test)
+
+    return {
+        "modelo": rf,
+        "imputacion": imputacion,
+        "ids": ids,
+        "columnas": list(X.columns),
+        "X_test": X_test,
+        "y_test": y_test,
+        "y_pred": y_pred,
+    }
@@ -0,0 +1,297 @@
+"""
+Resolución de nombres de equipos y estadios a un nombre canónico y a un id entero.
+
+Cada fuente escribe los nombres a su manera ("Real Madrid", "Real Madrid CF",
+"R. Madrid"...) y los CSV del pipeline los llevan rellenados con espacios
+("Athletic Club     "). Antes se normalizaban con `Series.replace` sobre
+diccionarios de alias exactos, y los nombres que no estaban en el
+diccionario pasaban sin avisar.
+
+`Resolutor` construye una sola vez un índice de alias plegados (sin espacios
+sobrantes, sin mayúsculas y sin tildes) y resuelve columnas enteras: solo se
+buscan los valores distintos (códigos de categoría) y el resultado se
+reparte a todas las filas en una pasada. Si un nombre no está en el índice
+se deja tal cual (sin espacios sobrantes): el alias más parecido (difflib)
+solo se sugiere, porque los filiales y los equipos de otras ligas se
+parecen mucho a los de LaLiga ("Villarreal B" no es "Villarreal CF"). Los
+nombres que no se resuelven y sus parecidos quedan en `informe()` para que
+quien llama los muestre (liga.union, liga.almacen...).
+
+Cada nombre canónico tiene un id entero compacto (int16) para agrupar, unir
+y filtrar por enteros en lugar de por textos:
+
+    EQUIPOS.resolver(df["HomeTeam"])   # nombres canónicos
+    EQUIPOS.ids(df["Local"])           # ids enteros
+    EQUIPOS.nombres_de(ids)            # de vuelta a nombres
+
+Los ids de los nombres del diccionario son siempre los mismos (orden
+alfabético); los de los nombres nuevos dependen del orden en que aparecen en
+cada proceso, así que estos ids sirven para trabajar en memoria pero no se
+guardan: los modelos llevan su propia tabla de ids (liga.modelos.ids_asistencia).
+"""
+
+import difflib
+import threading
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+UMBRAL_APROXIMADO = 0.85
+SIN_ID = -1
+
+MAPA_EQUIPOS = {
+    # DEPORTIVO ALAVÉS
+    'Alaves': 'Deportivo Alavés',
+    'Alavés': 'Deportivo Alavés',
+    'Deportivo Alavés': 'Deportivo Alavés',
+    # ATHLETIC CLUB
+    'Ath Bilbao': 'Athletic Club',
+    'Athletic Bilbao': 'Athletic Club',
+    'Bilbao': 'Athletic Club',
+    'Athletic Club': 'Athletic Club',
+    # ATLÉTICO DE MADRID
+    'Ath Madrid': 'Atlético de Madrid',
+    'Atlético Madrid': 'Atlético de Madrid',
+    'Atlético de Madrid': 'Atlético de Madrid',
+    # FC BARCELONA
+    'Barcelona': 'FC Barcelona',
+    'FC Barcelona': 'FC Barcelona',
+    # REAL BETIS
+    'Betis': 'Real Betis',
+    'Real Betis': 'Real Betis',
+    # RC CELTA
+    'Celta': 'RC Celta',
+    'Celta Vigo': 'RC Celta',
+    'Celta de Vigo': 'RC Celta',
+    'RC Celta de Vigo': 'RC Celta',
+    'RC Celta': 'RC Celta',
+    # RCD ESPANYOL
+    'Espanol': 'RCD Espanyol',
+    'Espanyol': 'RCD Espanyol',
+    'RCD Espanyol': 'RCD Espanyol',
+    # GETAFE CF
+    'Getafe': 'Getafe CF',
+    'Getafe CF': 'Getafe CF',
+    # GIRONA FC
+    'Girona': 'Girona FC',
+    'Girona FC': 'Girona FC',
+    # UD LAS PALMAS
+    'Las Palmas': 'UD Las Palmas',
+    'UD Las Palmas': 'UD Las Palmas',
+    # CD LEGANÉS
+    'Leganes': 'CD Leganés',
+    'Leganés': 'CD Leganés',
+    'CD Leganés': 'CD Leganés',
+    # RCD MALLORCA
+    'Mallorca': 'RCD Mallorca',
+    'RCD Mallorca': 'RCD Mallorca',
+    # CA OSASUNA
+    'Osasuna': 'CA Osasuna',
+    'CA Osasuna': 'CA Osasuna',
+    # RAYO VALLECANO
+    'Vallecano': 'Rayo Vallecano',
+    'Rayo Vallecano': 'Rayo Vallecano',
+    # REAL MADRID
+    'Real Madrid': 'Real Madrid',
+    'Real Madrid CF': 'Real Madrid',
+    # REAL SOCIEDAD
+    'Sociedad': 'Real Sociedad',
+    'Real Sociedad': 'Real Sociedad',
+    # SEVILLA FC
+    'Sevilla': 'Sevilla FC',
+    'Sevilla FC': 'Sevilla FC',
+    # VALENCIA CF
+    'Valencia': 'Valencia CF',
+    'Valencia CF': 'Valencia CF',
+    # REAL VALLADOLID
+    'Valladolid': 'Real Valladolid',
+    'Real Valladolid': 'Real Valladolid',
+    # VILLARREAL CF
+    'Villarreal': 'Villarreal CF',
+    'Villarreal CF': 'Villarreal CF'
+}
+
+MAPA_ESTADIOS = {
+    # DEPORTIVO ALAVÉS
+    'Mendizorrotza': 'Estadio de Mendizorroza',
+    'Mendizorrotza Stadium': 'Estadio de Mendizorroza',
+    'Estadio de Mendizorroza': 'Estadio de Mendizorroza',
+    'Mendizorroza': 'Estadio de Mendizorroza',
+    # ATHLETIC CLUB
+    'San Mamés': 'Estadio de San Mamés',
+    'Estadio San Mamés': 'Estadio de San Mamés',
+    'Estadio de San Mamés': 'Estadio de San Mamés',
+    # ATLÉTICO DE MADRID
+    'Cívitas Metropolitano': 'Estadio Metropolitano',
+    'Riyadh Air Metropolitano': 'Estadio Metropolitano',
+    'Estadio Riyadh Air Metropolitano': 'Estadio Metropolitano',
+    'Metropolitano': 'Estadio Metropolitano',
+    'Metropolitano Stadium': 'Estadio Metropolitano',
+    'Estadio Metropolitano': 'Estadio Metropolitano',
+    # FC BARCELONA
+    'Estadi Olímpic Lluís Companys': 'Estadi Olímpic Lluís Companys',
+    'Lluís Companys Olympic Stadium': 'Estadi Olímpic Lluís Companys',
+    'Estadio Olímpico Lluís Companys': 'Estadi Olímpic Lluís Companys',
+    'Olímpic Lluís Companys': 'Estadi Olímpic Lluís Companys',
+    # REAL BETIS
+    'Benito Villamarín': 'Estadio Benito Villamarín',
+    'Estadio Benito Villamarín': 'Estadio Benito Villamarín',
+    # RC CELTA
+    'Balaídos': 'Estadio de Balaídos',
+    'Abanca-Balaídos': 'Estadio de Balaídos',
+    'Estadio Abanca Balaídos': 'Estadio de Balaídos', ''
+    'Estadio de Balaídos': 'Estadio de Balaídos',
+    'ABANCA Balaídos': 'Estadio de Balaídos',
+    # RCD ESPANYOL
+    'RCDE Stadium': 'RCDE Stadium',
+    'Stage Front Stadium': 'RCDE Stadium',
+    # GETAFE CF
+    'Coliseum': 'Estadio Coliseum',
+    'Coliseum (Getafe)': 'Estadio Coliseum',
+    'Estadio Coliseum': 'Estadio Coliseum',
+    # GIRONA FC
+    'Montilivi': 'Estadi Montilivi',
+    'Estadi Montilivi': 'Estadi Montilivi',
+    'Estadio Municipal de Montilivi': 'Estadi Montilivi',
+    # UD LAS PALMAS
+    'Gran Canaria': 'Estadio de Gran Canaria',
+    'Estadio Gran Canaria': 'Estadio de Gran Canaria',
+    'Estadio de Gran Canaria': 'Estadio de Gran Canaria',
+    # CD LEGANÉS
+    'Butarque': 'Estadio Municipal de Butarque',
+    'Estadio Municipal Butarque': 'Estadio Municipal de Butarque',
+    'Estadio Municipal de Butarque': 'Estadio Municipal de Butarque',
+    'Municipal de Butarque': 'Estadio Municipal de Butarque',
+    # RCD MALLORCA
+    'Son Moix': 'Estadi Mallorca Son Moix',
+    'Mallorca Son Moix': 'Estadi Mallorca Son Moix',
+    'Estadi Mallorca Son Moix': 'Estadi Mallorca Son Moix',
+    'Estadio de Son Moix': 'Estadi Mallorca Son Moix',
+    'Visit Mallorca Estadi': 'Estadi Mallorca Son Moix',
+    # CA OSASUNA
+    'El Sadar': 'Estadio El Sadar',
+    'Estadio El Sadar': 'Estadio El Sadar',
+    # RAYO VALLECANO
+    'Vallecas': 'Estadio de Vallecas',
+    'Estadio de Vallecas': 'Estadio de Vallecas',
+    'Campo de Fútbol de Vallecas': 'Estadio de Vallecas',
+    'Vallecas Stadium': 'Estadio de Vallecas',
+    # REAL MADRID
+    'Santiago Bernabéu': 'Estadio Santiago Bernabéu',
+    'Estadio Santiago Bernabéu': 'Estadio Santiago Bernabéu',
+    'Santiago Bernabéu Stadium': 'Estadio Santiago Bernabéu',
+    # REAL SOCIEDAD
+    'Anoeta': 'Estadio de Anoeta',
+    'Anoeta Stadium': 'Estadio de Anoeta',
+    'Reale Arena': 'Estadio de Anoeta',
+    'Estadio de Anoeta': 'Estadio de Anoeta',
+    # SEVILLA FC
+    'Ramón Sánchez Pizjuán': 'Estadio Ramón Sánchez-Pizjuán',
+    'Estadio Ramón Sánchez-Pizjuán': 'Estadio Ramón Sánchez-Pizjuán',
+    'Ramón Sánchez Pizjuán Stadium': 'Estadio Ramón Sánchez-Pizjuán',
+    'Ramón Sánchez-Pizjuán': 'Estadio Ramón Sánchez-Pizjuán',
+    # VALENCIA CF
+    'Mestalla': 'Estadio de Mestalla',
+    'Estadio de Mestalla': 'Estadio de Mestalla',
+    # REAL VALLADOLID
+    'José Zorrilla': 'Estadio José Zorrilla',
+    'Estadio José Zorrilla': 'Estadio José Zorrilla',
+    # VILLARREAL CF
+    'La Cerámica': 'Estadio de la Cerámica',
+    'Estadio de la Cerámica': 'Estadio de la Cerámica',
+    # GENÉRICOS
+    'Desconocido': 'Desconocido'
+}
+
+
+def plegar(texto):
+    """
+    Clave de búsqueda de un nombre: sin espacios sobrantes, sin mayúsculas y sin tildes
+    """
+    texto = " ".join(str(texto).split()).casefold()
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+class Resolutor:
+    """
+    Índice de alias -> nombre canónico, con búsqueda aproximada de respaldo
+    """
+
+    def __init__(self, alias, umbral=UMBRAL_APROXIMADO, nombre="nombres"):
+        self.umbral = umbral
+        self.nombre = nombre
+        # Los nombres canónicos también son alias de sí mismos
+        self._indice = {plegar(canonico): canonico for canonico in alias.values()}
+        self._indice.update({plegar(a): canonico for a, canonico in alias.items()})
+        self._claves = list(self._indice)
+        # Ids estables para los nombres conocidos; los nuevos se añaden al final
+        self.nombres = sorted(set(alias.values()))
+        self._id = {n: i for i, n in enumerate(self.nombres)}
+        self.aproximados = {}
+        self.sin_resolver = set()
+        # El dashboard y el servicio resuelven desde varios hilos a la vez
+        self._cerrojo = threading.Lock()
+
+    def _resolver_uno(self, valor):
+        clave = plegar(valor)
+        if not clave:
+            return None
+        if clave in self._indice:
+            return self._indice[clave]
+        # No está en el diccionario: se deja tal cual y se anota una sola vez
+        # (caché), con el alias más parecido como sugerencia para añadirlo
+        canonico = " ".join(valor.split())
+        self.sin_resolver.add(canonico)
+        parecidos = difflib.get_close_matches(clave, self._claves, n=1, cutoff=self.umbral)
+        if parecidos:
+            self.aproximados[canonico] = self._indice[parecidos[0]]
+        self._indice[clave] = canonico
+        return canonico
+
+    def _canonicos(self, serie):
+        codigos, unicos = pd.factorize(pd.Series(serie), sort=False)
+        with self._cerrojo:
+            canonicos = np.array([self._resolver_uno(str(v)) for v in unicos], dtype=object)
+        return codigos, canonicos
+
+    def resolver(self, serie):
+        """
+        Nombres canónicos de toda la columna (los valores vacíos se quedan vacíos)
+        """
+        serie = pd.Series(serie)
+        codigos, canonicos = self._canonicos(serie)
+        resultado = np.append(canonicos, None)[codigos]
+        return pd.Series(resultado, index=serie.index, name=serie.name, dtype=object)
+
+    def ids(self, serie):
+        """
+        Id entero de cada fila (SIN_ID si está vacía)
+        """
+        serie = pd.Series(serie)
+        codigos, canonicos = self._canonicos(serie)
+        with self._cerrojo:
+            for canonico in canonicos:
+                if canonico is not None and canonico not in self._id:
+                    self._id[canonico] = len(self.nombres)
+                    self.nombres.append(canonico)
+        ids_unicos = np.array([self._id.get(c, SIN_ID) for c in canonicos] + [SIN_ID], dtype=np.int16)
+        return pd.Series(ids_unicos[codigos], index=serie.index, name=serie.name)
+
+    def nombres_de(self, ids):
+        """
+        Nombre canónico de cada id (vacío para SIN_ID)
+        """
+        ids = np.asarray(ids)
+        return np.append(np.array(self.nombres, dtype=object), None)[np.where(ids == SIN_ID, len(self.nombres), ids)]
+
+    def informe(self):
+        """
+        Nombres que no están en el diccionario y, de los que se parecen a un
+        alias, el nombre canónico más parecido
+        """
+        return {"aproximados": dict(self.aproximados), "sin_resolver": sorted(self.sin_resolver)}
+
+
+EQUIPOS = Resolutor(MAPA_EQUIPOS, nombre="Equipos")
+ESTADIOS = Resolutor(MAPA_ESTADIOS, nombre="Estadios")
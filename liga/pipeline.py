@@ -0,0 +1,168 @@
+"""
+Actualización de los datos en un solo comando.
+
+Encadena las etapas que antes se hacían a mano entre el notebook
+TrabajoFinal1.ipynb y Apache Hop:
+    union   -> inputs/hop.txt.csv (antes filename.hpl)
+    clima   -> outputs/partidos_con_clima_completo.csv
+    hype    -> outputs/partidos_completo_con_hype.csv
+    almacen -> outputs/almacen/partidos/liga=.../temporada=.../ (lo que lee el dashboard)
+
+Los CSV de partidos, asistencia y coordenadas (PASOS 1-6 del notebook) son
+la entrada de la primera etapa.
+
+Es incremental (liga.incremental): clima y hype solo se calculan para los
+partidos nuevos o modificados desde la última ejecución, y el resto se toma
+de las salidas anteriores. Las salidas se publican todas juntas al terminar.
+Con --completo se recalcula todo.
+
+Uso desde la terminal:
+    python -m liga.pipeline
+    python -m liga.pipeline --etapas union clima almacen
+    python -m liga.pipeline --etapas almacen --liga SP1
+    python -m liga.pipeline --completo
+    python -m liga.pipeline --clima-grabado tests_clima/   # sin conexión
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from liga.almacen import RUTA_CSV_PARTIDOS, almacen_actualizado, construir_almacen
+from liga.incremental import (Publicacion, anotar_etapa, clave_partido, filas_pendientes,
+                              guardar_estado, huellas_filas, leer_estado)
+from liga.ligas import LIGA_POR_DEFECTO, datos_liga
+from liga.union import RUTA_HOP, generar_hop, imprimir_nombres
+
+RUTA_HYPE = "outputs/partidos_completo_con_hype.csv"
+ETAPAS = ["union", "clima", "hype", "almacen"]
+
+
+def _informar(etapa, pendientes, estado_etapa):
+    marca = estado_etapa.get("marca") or "ninguna"
+    print(f"   [INFO] {etapa}: {int(pendientes.sum())} partidos nuevos o modificados de {len(pendientes)} (marca anterior: {marca})")
+
+
+def etapa_union(args, publicacion, estado):
+    # Son uniones en memoria (milisegundos): se rehace siempre entera
+    generar_hop(ruta_salida=publicacion.temporal(RUTA_HOP))
+
+
+def etapa_clima(args, publicacion, estado):
+    from liga.clima import VARIABLES_HORARIAS, ClienteGrabado, ClienteOpenMeteo, enriquecer_clima
+
+    df = pd.read_csv(publicacion.leer(RUTA_HOP))
+    claves, huellas = clave_partido(df), huellas_filas(df)
+    columnas = list(VARIABLES_HORARIAS.values())
+    pendientes = filas_pendientes(claves, huellas, estado.get("clima", {}))
+
+    # Clima de los partidos ya procesados: de la salida anterior
+    valores = pd.DataFrame(np.nan, index=df.index, columns=columnas)
+    if os.path.exists(RUTA_CSV_PARTIDOS) and not pendientes.all():
+        # round_trip: los valores reescritos quedan idénticos a los que ya había en el CSV
+        previo = pd.read_csv(RUTA_CSV_PARTIDOS, float_precision="round_trip")
+        previo = previo.set_axis(clave_partido(previo))
+        previo = previo[~previo.index.duplicated()]
+        conocidas = claves.isin(previo.index)
+        valores.loc[conocidas] = previo.loc[claves[conocidas], columnas].to_numpy()
+        pendientes |= ~conocidas
+    else:
+        pendientes[:] = True
+    _informar("clima", pendientes, estado.get("clima", {}))
+
+    if pendientes.any():
+        cliente = ClienteGrabado(args.clima_grabado) if args.clima_grabado else ClienteOpenMeteo()
+        zona_horaria = datos_liga(args.liga)["zona_horaria"]
+        valores.loc[pendientes] = enriquecer_clima(df[pendientes], cliente, zona_horaria=zona_horaria)[columnas].to_numpy()
+
+    df[columnas] = valores
+    df.to_csv(publicacion.temporal(RUTA_CSV_PARTIDOS), index=False, encoding='utf-8-sig')
+    anotar_etapa(estado, "clima", claves, huellas, df["Date"])
+    print(f"   [OK] Preparado: {RUTA_CSV_PARTIDOS}")
+
+
+def etapa_hype(args, publicacion, estado):
+    from liga.hype import (ClientePytrends, ClienteSimulado, Planificador, agrupar_jornadas,
+                           normalizar_hype, recoger_hype)
+
+    df = pd.read_csv(publicacion.leer(RUTA_CSV_PARTIDOS), float_precision="round_trip")
+    claves = clave_partido(df)
+    # El hype solo depende de los equipos y la fecha
+    huellas = huellas_filas(df[["Local", "Visitante", "Date"]])
+    liga = datos_liga(args.liga)
+    # Los brutos de otro término ancla están en otra escala: se recalculan todos
+    estado_hype = estado.get("hype", {}) if estado.get("hype", {}).get("ancla") == liga["ancla_trends"] else {}
+    brutos = dict(estado_hype.get("brutos", {}))
+    pendientes = filas_pendientes(claves, huellas, estado_hype) | claves.map(brutos).isna()
+    _informar("hype", pendientes, estado_hype)
+
+    if pendientes.any():
+        if args.hype_simulado:
+            # El cliente simulado no tiene límite de peticiones: no hace falta esperar
+            cliente, planificador = ClienteSimulado(), Planificador(dormir=lambda segundos: None)
+        else:
+            cliente, planificador = ClientePytrends(geo=liga["geo_trends"]), Planificador()
+        # Jornadas completas de los partidos pendientes: así cada consulta cubre
+        # la misma ventana que si se recalculase la temporada entera
+        jornadas = agrupar_jornadas(pd.to_datetime(df["Date"], dayfirst=True, errors="coerce"))
+        afectados = jornadas.isin(jornadas[pendientes].dropna().unique()) | pendientes
+        nuevos = recoger_hype(df[afectados], cliente, planificador, ancla=liga["ancla_trends"])
+        brutos.update({c: (None if pd.isna(v) else float(v)) for c, v in zip(claves[afectados], nuevos)})
+
+    # La normalización (0-100) es global: se rehace con todos los partidos
+    df['Hype_Google_Trends'] = normalizar_hype(claves.map(brutos).astype(float)).to_numpy()
+    df.to_csv(publicacion.temporal(RUTA_HYPE), index=False, encoding='utf-8-sig')
+    vigentes = set(claves)
+    anotar_etapa(estado, "hype", claves, huellas, df["Date"],
+                 brutos={c: v for c, v in brutos.items() if c in vigentes}, ancla=liga["ancla_trends"])
+    print(f"   [OK] Preparado: {RUTA_HYPE}")
+
+
+def etapa_almacen(args, publicacion, estado):
+    if almacen_actualizado() and not args.completo:
+        print("   [OK] El almacén ya está al día")
+        return
+    ruta = construir_almacen(liga=args.liga)
+    print(f"   [OK] Almacén generado en: {ruta}")
+    imprimir_nombres()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Actualiza los datos de La Liga de principio a fin")
+    parser.add_argument("--etapas", nargs="+", choices=ETAPAS, default=ETAPAS, help="Etapas a ejecutar (por defecto, todas)")
+    parser.add_argument("--completo", action="store_true", help="Recalcula todos los partidos, no solo los nuevos o modificados")
+    parser.add_argument("--clima-grabado", metavar="CARPETA", help="Usa respuestas de Open-Meteo grabadas en lugar de la API")
+    parser.add_argument("--hype-simulado", action="store_true", help="Usa el cliente simulado de Google Trends")
+    parser.add_argument("--liga", default=LIGA_POR_DEFECTO, help="Liga de los partidos: zona horaria del clima, país de Google Trends y partición del almacén")
+    args = parser.parse_args(argv)
+
+    estado = {} if args.completo else leer_estado()
+    publicacion = Publicacion()
+    funciones = {"union": etapa_union, "clima": etapa_clima, "hype": etapa_hype, "almacen": etapa_almacen}
+    try:
+        for etapa in ETAPAS:
+            if etapa not in args.etapas:
+                continue
+            if etapa == "almacen":
+                # El almacén se construye a partir de los CSV ya publicados
+                print(f"   [OK] Publicados: {', '.join(publicacion.publicar()) or 'sin cambios'}")
+                guardar_estado(estado)
+            print("\n-------------------------------------------------------------")
+            print(f"--> ETAPA: {etapa}")
+            print("-------------------------------------------------------------")
+            inicio = time.perf_counter()
+            funciones[etapa](args, publicacion, estado)
+            print(f"   [INFO] {etapa}: {time.perf_counter() - inicio:.1f} s")
+    except BaseException:
+        publicacion.descartar()
+        raise
+    if publicacion.pendientes:
+        print(f"   [OK] Publicados: {', '.join(publicacion.publicar()) or 'sin cambios'}")
+        guardar_estado(estado)
+
+
+if __name__ == "__main__":
+    main()
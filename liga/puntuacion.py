@@ -0,0 +1,277 @@
+"""
+Puntuación por lotes de partidos futuros con los modelos ya entrenados.
+
+El dashboard solo evalúa los modelos sobre una partición de prueba de
+partidos ya jugados. Aquí se cargan del registro (outputs/modelos/) la
+regresión logística de resultados y el Random Forest de asistencia de cada
+liga, y se puntúa un CSV o Parquet de partidos por jugar (equipos, fecha,
+cuotas y previsión del clima) sin arrancar Streamlit:
+- probabilidades de H/D/A y resultado más probable;
+- asistencia prevista con su intervalo (variabilidad entre árboles,
+  liga.incertidumbre).
+
+El fichero se lee y se escribe por bloques de filas, así que la memoria no
+depende del número de partidos. Si hay columna "Div" (como en los CSV de
+football-data.co.uk), cada partido se puntúa con los modelos de su liga.
+De cada liga se usan los modelos entrenados con las temporadas que se
+indiquen; por defecto, los de su última temporada en el almacén (la
+selección por defecto del dashboard).
+Las columnas que falten (una cuota que aún no se publica, el estadio...) se
+rellenan como en el entrenamiento: con la media del modelo, y el estadio y
+sus coordenadas con los del último partido del equipo local en el almacén.
+
+Uso desde la terminal:
+    python -m liga.puntuacion --entrada inputs/proxima_jornada.csv --salida outputs/predicciones.csv
+    python -m liga.puntuacion --entrada fixtures.parquet --salida predicciones.parquet --liga E0
+    python -m liga.puntuacion --entrada fixtures.csv --salida predicciones.csv --temporadas 2023-24 2024-25
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from liga.almacen import leer_partidos, particiones
+from liga.incertidumbre import intervalos_bosque
+from liga.ligas import LIGA_POR_DEFECTO
+from liga.modelos import (CARPETA_MODELOS, cargar_modelo, nombre_modelo, temporadas_modelo,
+                          variables_asistencia, variables_resultado)
+from liga.nombres import EQUIPOS, ESTADIOS
+from liga.union import imprimir_nombres
+
+TAM_BLOQUE = 10000
+COLUMNAS_IDENTIFICACION = ["Div", "Date", "Time", "Local", "Visitante", "Estadio"]
+COLUMNAS_SALIDA = ["Prob_H", "Prob_D", "Prob_A", "Prediccion",
+                   "Asistencia_Pred", "Asistencia_Std", "Asistencia_Inferior", "Asistencia_Superior"]
+# Nombres de football-data.co.uk -> nombres del dataset
+RENOMBRAR = {"HomeTeam": "Local", "AwayTeam": "Visitante"}
+
+
+def _estadios_locales(liga):
+    """
+    Estadio y coordenadas del último partido en casa de cada equipo de la liga
+    """
+    if liga not in particiones(None):
+        return pd.DataFrame(columns=["Estadio", "Latitud", "Longitud"])
+    df = leer_partidos(columnas=["Date", "Local", "Estadio", "Latitud", "Longitud"], ligas=[liga], ruta_csv=None)
+    df = df.sort_values("Date").drop_duplicates("Local", keep="last")
+    return df.set_index("Local")[["Estadio", "Latitud", "Longitud"]]
+
+
+def temporadas_por_defecto(liga):
+    """
+    Última temporada de la liga en el almacén, como la selección por defecto del dashboard
+    """
+    return tuple(particiones(None).get(liga, [])[-1:])
+
+
+def _numeros(X):
+    # Lo que no es un número finito (texto, infinito...) cuenta como hueco
+    return X.apply(pd.to_numeric, errors="coerce").replace([np.inf, -np.inf], np.nan)
+
+
+class Puntuador:
+    """
+    Modelos de resultado y asistencia de una liga entrenados con unas
+    temporadas (por defecto, temporadas_por_defecto), cargados una sola vez
+    """
+
+    def __init__(self, liga=LIGA_POR_DEFECTO, temporadas=None, carpeta=CARPETA_MODELOS, z=2.0):
+        self.liga = liga
+        self.temporadas = tuple(sorted(temporadas or temporadas_por_defecto(liga)))
+        self.z = z
+        self.resultado = cargar_modelo(nombre_modelo("resultado", liga, self.temporadas), carpeta)
+        self.asistencia = cargar_modelo(nombre_modelo("asistencia", liga, self.temporadas), carpeta)
+        if self.resultado is None and self.asistencia is None:
+            entrenadas = [" + ".join(t) for t in temporadas_modelo("resultado", liga, carpeta)]
+            raise FileNotFoundError(
+                f"No hay modelos entrenados de {liga} {' + '.join(self.temporadas) or '(sin temporadas en el almacén)'} "
+                f"en {carpeta} (se entrenan al abrir la página de predicción del dashboard con esa selección"
+                + (f"; hay modelos de: {', '.join(entrenadas)})" if entrenadas else ")"))
+        if self.asistencia is not None and self.asistencia.get("ids") is None:
+            raise ValueError(
+                f"El modelo de asistencia de {liga} {' + '.join(self.temporadas)} no guarda su tabla de ids "
+                f"(versión anterior): se reentrena al abrir la página de predicción del dashboard con esa selección")
+        self.estadios = _estadios_locales(liga)
+
+        if self.resultado is not None:
+            preprocesado = self.resultado["preprocesado"]
+            numericas = preprocesado.transformers_[0][2]
+            # Huecos del resultado: la media del entrenamiento (tras el escalado valen 0)
+            self._medias_resultado = pd.Series(preprocesado.named_transformers_["numericas"].mean_, index=numericas)
+        # Columnas de entrada que los modelos leen como números (liga.servicio las valida)
+        self.columnas_numericas = set(self._medias_resultado.index if self.resultado is not None else [])
+        if self.asistencia is not None:
+            self.columnas_numericas |= set(self.asistencia["columnas"])
+
+    def preparar(self, df):
+        """
+        Nombres canónicos, fecha y estadio (si falta) de los partidos a puntuar
+        """
+        df = df.rename(columns=RENOMBRAR)
+        df = df.assign(Local=EQUIPOS.resolver(df["Local"]), Visitante=EQUIPOS.resolver(df["Visitante"]),
+                       Date=pd.to_datetime(df["Date"], dayfirst=True, errors="coerce"))
+        conocidos = self.estadios.reindex(df["Local"].to_numpy()).set_axis(df.index)
+        for columna in ["Estadio", "Latitud", "Longitud"]:
+            df[columna] = df[columna].fillna(conocidos[columna]) if columna in df.columns else conocidos[columna]
+        df["Estadio"] = ESTADIOS.resolver(df["Estadio"])
+        return df
+
+    def puntuar_resultado(self, df):
+        preprocesado, modelo = self.resultado["preprocesado"], self.resultado["modelo"]
+        X = variables_resultado(df).reindex(columns=preprocesado.feature_names_in_)
+        numericas = self._medias_resultado.index
+        X[numericas] = _numeros(X[numericas]).fillna(self._medias_resultado)
+        probabilidades = modelo.predict_proba(preprocesado.transform(X))
+        clases = list(modelo.classes_)
+        salida = pd.DataFrame({f"Prob_{c}": probabilidades[:, clases.index(c)] for c in "HDA"}, index=df.index)
+        salida["Prediccion"] = np.asarray(clases, dtype=object)[probabilidades.argmax(axis=1)]
+        return salida
+
+    def puntuar_asistencia(self, df):
+        # Mismos ids de equipos y estadios que en el entrenamiento (los nuevos quedan como SIN_ID)
+        X = variables_asistencia(df, self.asistencia["ids"]).reindex(columns=self.asistencia["columnas"])
+        X = self.asistencia["imputacion"].transform(_numeros(X))
+        intervalos = intervalos_bosque(self.asistencia["modelo"], X, z=self.z)
+        return pd.DataFrame({
+            "Asistencia_Pred": intervalos["media"],
+            "Asistencia_Std": intervalos["std"],
+            "Asistencia_Inferior": intervalos["inferior"].clip(lower=0),
+            "Asistencia_Superior": intervalos["superior"],
+        }, index=df.index)
+
+    def puntuar(self, df, preparado=False):
+        """
+        Probabilidades H/D/A y asistencia prevista de cada partido (mismo índice que df)
+        """
+        if not preparado:
+            df = self.preparar(df)
+        partes = []
+        if self.resultado is not None:
+            partes.append(self.puntuar_resultado(df))
+        if self.asistencia is not None:
+            partes.append(self.puntuar_asistencia(df))
+        return pd.concat(partes, axis=1).reindex(columns=COLUMNAS_SALIDA)
+
+
+# ---------------------------------
+# FICHEROS POR BLOQUES
+# ---------------------------------
+def _formato(ruta):
+    return "parquet" if os.path.splitext(ruta)[1].lower() in (".parquet", ".pq") else "csv"
+
+
+def leer_bloques(ruta, tam_bloque=TAM_BLOQUE):
+    """
+    Recorre un CSV o Parquet en DataFrames de como mucho `tam_bloque` filas
+    """
+    if _formato(ruta) == "parquet":
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tam_bloque):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, chunksize=tam_bloque)
+
+
+def _esquema_salida(columnas):
+    # Fijo para todo el fichero: un bloque sin partidos puntuados (liga sin
+    # modelo) tiene las predicciones vacías y no sirve para deducirlo
+    flotantes = set(COLUMNAS_SALIDA) - {"Prediccion"}
+    return pa.schema([(c, pa.float64() if c in flotantes else pa.string()) for c in columnas])
+
+
+def _como_texto(serie):
+    # Columnas de identificación como texto (las fechas de un Parquet, en el formato de los CSV)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.strftime("%d/%m/%Y").astype("string")
+    return serie.astype("string")
+
+
+class _Escritor:
+    """
+    Escribe los bloques de salida uno tras otro (CSV o Parquet)
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.formato = _formato(ruta)
+        self._parquet = None
+        self._primero = True
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+
+    def escribir(self, df):
+        if self.formato == "parquet":
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.ruta, _esquema_salida(df.columns))
+            self._parquet.write_table(pa.Table.from_pandas(df, schema=self._parquet.schema, preserve_index=False))
+        else:
+            df.to_csv(self.ruta, mode="w" if self._primero else "a", header=self._primero, index=False, encoding="utf-8")
+        self._primero = False
+
+    def cerrar(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def puntuar_fichero(ruta_entrada, ruta_salida, liga=LIGA_POR_DEFECTO, tam_bloque=TAM_BLOQUE, carpeta=CARPETA_MODELOS, z=2.0,
+                    temporadas=None):
+    """
+    Puntúa todos los partidos de `ruta_entrada` y escribe las predicciones en
+    `ruta_salida`. Los modelos de cada liga (entrenados con `temporadas`) se
+    cargan una vez para todo el fichero. Devuelve el número de partidos
+    puntuados por liga.
+    """
+    puntuadores, contados = {}, {}
+    escritor = _Escritor(ruta_salida)
+    try:
+        for bloque in leer_bloques(ruta_entrada, tam_bloque):
+            bloque = bloque.rename(columns=RENOMBRAR)
+            ligas = bloque["Div"].fillna(liga) if "Div" in bloque.columns else pd.Series(liga, index=bloque.index)
+            partes = []
+            for codigo, grupo in bloque.groupby(ligas, sort=False):
+                if codigo not in puntuadores:
+                    try:
+                        puntuadores[codigo] = Puntuador(codigo, temporadas, carpeta, z)
+                    except (FileNotFoundError, ValueError) as error:
+                        # Sin modelo o con un modelo antiguo: se salta esa liga, no todo el fichero
+                        print(f"   [AVISO] {error}")
+                        puntuadores[codigo] = None
+                if puntuadores[codigo] is not None:
+                    partes.append(puntuadores[codigo].puntuar(grupo))
+                    contados[codigo] = contados.get(codigo, 0) + len(grupo)
+
+            # Mismo orden que la entrada; los partidos de ligas sin modelo quedan vacíos
+            puntuado = pd.concat(partes) if partes else pd.DataFrame(columns=COLUMNAS_SALIDA)
+            identificacion = bloque[[c for c in COLUMNAS_IDENTIFICACION if c in bloque.columns]].apply(_como_texto)
+            salida = pd.concat([identificacion, puntuado.reindex(bloque.index)], axis=1)
+            escritor.escribir(salida.astype({c: float for c in COLUMNAS_SALIDA if c != "Prediccion"}))
+    finally:
+        escritor.cerrar()
+    return contados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predice resultado y asistencia de partidos por jugar con los modelos entrenados")
+    parser.add_argument("--entrada", required=True, help="CSV o Parquet con los partidos (equipos, fecha, cuotas y previsión del clima)")
+    parser.add_argument("--salida", required=True, help="CSV o Parquet de predicciones")
+    parser.add_argument("--liga", default=LIGA_POR_DEFECTO, help="Liga de los partidos sin columna Div")
+    parser.add_argument("--temporadas", nargs="+", help="Temporadas con las que se entrenaron los modelos (por defecto, la última de cada liga)")
+    parser.add_argument("--modelos", default=CARPETA_MODELOS, help="Carpeta del registro de modelos")
+    parser.add_argument("--tam-bloque", type=int, default=TAM_BLOQUE, help="Filas que se puntúan a la vez")
+    parser.add_argument("-z", type=float, default=2.0, help="Anchura del intervalo de asistencia (media ± z·std)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    contados = puntuar_fichero(args.entrada, args.salida, args.liga, args.tam_bloque, args.modelos, args.z, args.temporadas)
+    total = sum(contados.values())
+    for liga, n in contados.items():
+        print(f"   > {liga}: {n} partidos")
+    print(f"   [OK] {total} partidos puntuados en {time.perf_counter() - inicio:.1f} s: {args.salida}")
+    imprimir_nombres()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Selección progresiva de variables (hacia adelante y hacia atrás) para la
+regresión logística de resultados.
+
+Es la misma búsqueda que `forward_selection_reg_models` y
+`backward_selection_reg_models` de predicciones.ipynb, pero:
+- los candidatos de cada paso se evalúan en paralelo en un pool de procesos
+  (los datos se envían una sola vez a cada proceso, no en cada tarea);
+- cada ajuste parte (warm start) de los coeficientes del mejor modelo del paso
+  anterior, así lbfgs converge en muchas menos iteraciones;
+- tras cada paso se guarda un checkpoint JSON, de forma que una ejecución
+  interrumpida continúa donde se quedó;
+- las funciones son generadores: cada paso se devuelve en cuanto termina,
+  con el modelo que ganó en el pool ya ajustado (paso["modelo"]), así que no
+  hace falta volver a entrenarlo.
+
+Ejemplo:
+    for paso in seleccion_hacia_adelante(X_train, y_train, X_val, y_val, dummies,
+                                         ruta_checkpoint=ruta_seleccion("adelante", "SP1", ["2024-25"])):
+        print(paso["n_variables"], paso["variable"], paso["f1"], paso["modelo"].coef_.shape)
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import os
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+
+from liga.modelos import huella_datos
+
+CARPETA_SELECCION = "outputs/seleccion"
+MAX_ITER = 500
+VERSION_CHECKPOINT = 2   # desde la 2, cada paso guarda los coeficientes de su modelo
+
+# Datos de cada proceso del pool (se rellenan en _inicializar_proceso)
+_DATOS = {}
+
+
+def _inicializar_proceso(X_train, y_train, X_val, y_val, max_iter):
+    _DATOS.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val, max_iter=max_iter)
+
+
+def _ajustar(X_train, y_train, columnas, max_iter, coef_inicial=None, intercept_inicial=None):
+    modelo = LogisticRegression(solver="lbfgs", max_iter=max_iter, warm_start=coef_inicial is not None)
+    if coef_inicial is not None:
+        # Con warm_start=True, lbfgs arranca desde coef_/intercept_ si ya existen
+        modelo.coef_ = coef_inicial
+        modelo.intercept_ = intercept_inicial
+    modelo.fit(X_train[:, columnas], y_train)
+    return modelo
+
+
+def _evaluar_candidato(variable, columnas, coef_inicial, intercept_inicial):
+    """
+    Ajusta la regresión logística con `columnas` y devuelve su F1 en validación
+    """
+    modelo = _ajustar(_DATOS["X_train"], _DATOS["y_train"], columnas, _DATOS["max_iter"], coef_inicial, intercept_inicial)
+    y_pred = modelo.predict(_DATOS["X_val"][:, columnas])
+    f1 = f1_score(_DATOS["y_val"], y_pred, average="weighted")
+    return variable, f1, modelo.coef_, modelo.intercept_
+
+
+def _modelo_de_paso(paso, clases, max_iter):
+    # Regresión logística del paso con los coeficientes del pool, sin reentrenar
+    modelo = LogisticRegression(solver="lbfgs", max_iter=max_iter)
+    modelo.classes_ = clases
+    modelo.coef_ = np.array(paso["coef"])
+    modelo.intercept_ = np.array(paso["intercept"])
+    modelo.n_features_in_ = len(paso["variables"])
+    modelo.feature_names_in_ = np.array(paso["variables"], dtype=object)
+    return modelo
+
+
+def ruta_seleccion(direccion, liga, temporadas, carpeta=CARPETA_SELECCION):
+    """
+    Checkpoint de una selección ("adelante"/"atras") con los datos de una liga y temporadas
+    """
+    return os.path.join(carpeta, f"{direccion}_{liga}_{'+'.join(sorted(temporadas))}.json")
+
+
+def _leer_checkpoint(ruta, huella):
+    if ruta and os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            estado = json.load(f)
+        if estado.get("huella") == huella:
+            return estado
+    return None
+
+
+def _guardar_checkpoint(ruta, estado):
+    if not ruta:
+        return
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    ruta_tmp = ruta + ".tmp"
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False)
+    os.replace(ruta_tmp, ruta)
+
+
+def _seleccion(direccion, X_train, y_train, X_val, y_val, fijas, ruta_checkpoint, n_procesos, max_iter):
+    columnas = list(X_train.columns)
+    posicion = {c: i for i, c in enumerate(columnas)}
+    parametros = {"direccion": direccion, "fijas": list(fijas), "max_iter": max_iter, "version": VERSION_CHECKPOINT}
+    huella = huella_datos(X_train, y_train, X_val, y_val, parametros=parametros)
+    clases = np.unique(np.asarray(y_train))
+
+    estado = _leer_checkpoint(ruta_checkpoint, huella)
+    if estado is None:
+        seleccionadas = list(fijas) if direccion == "adelante" else list(columnas)
+        estado = {"huella": huella, "direccion": direccion, "seleccionadas": seleccionadas, "pasos": [], "terminado": False}
+        coef, intercept = None, None
+    else:
+        coef = np.array(estado["coef"]) if estado.get("coef") is not None else None
+        intercept = np.array(estado["intercept"]) if estado.get("intercept") is not None else None
+
+    # Los pasos ya hechos en una ejecución anterior se devuelven primero
+    for paso in estado["pasos"]:
+        yield {**paso, "modelo": _modelo_de_paso(paso, clases, max_iter)}
+    if estado["terminado"]:
+        return
+
+    datos = (X_train.to_numpy(dtype=float), np.asarray(y_train), X_val.to_numpy(dtype=float), np.asarray(y_val), max_iter)
+    with ProcessPoolExecutor(max_workers=n_procesos, initializer=_inicializar_proceso, initargs=datos) as pool:
+        while True:
+            seleccionadas = estado["seleccionadas"]
+            futuros = []
+            if direccion == "adelante":
+                for variable in columnas:
+                    if variable in seleccionadas:
+                        continue
+                    candidato = [posicion[c] for c in seleccionadas + [variable]]
+                    # El coeficiente de la variable nueva arranca en 0
+                    coef_inicial = None if coef is None else np.hstack([coef, np.zeros((coef.shape[0], 1))])
+                    futuros.append(pool.submit(_evaluar_candidato, variable, candidato, coef_inicial, intercept))
+            else:
+                for variable in seleccionadas:
+                    if variable in fijas or len(seleccionadas) == 1:
+                        continue
+                    quitar = seleccionadas.index(variable)
+                    candidato = [posicion[c] for c in seleccionadas if c != variable]
+                    coef_inicial = None if coef is None else np.delete(coef, quitar, axis=1)
+                    futuros.append(pool.submit(_evaluar_candidato, variable, candidato, coef_inicial, intercept))
+
+            if not futuros:
+                estado["terminado"] = True
+                _guardar_checkpoint(ruta_checkpoint, estado)
+                return
+
+            mejor = None
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                # En caso de empate gana la primera variable en el orden de las columnas, como en el notebook
+                if mejor is None or resultado[1] > mejor[1] or (resultado[1] == mejor[1] and posicion[resultado[0]] < posicion[mejor[0]]):
+                    mejor = resultado
+            variable, f1, coef, intercept = mejor
+
+            if direccion == "adelante":
+                seleccionadas = seleccionadas + [variable]
+            else:
+                seleccionadas = [c for c in seleccionadas if c != variable]
+
+            paso = {"n_variables": len(seleccionadas), "variable": variable, "f1": float(f1), "variables": seleccionadas,
+                    "coef": coef.tolist(), "intercept": intercept.tolist()}
+            estado["seleccionadas"] = seleccionadas
+            estado["pasos"].append(paso)
+            estado["coef"] = coef.tolist()
+            estado["intercept"] = intercept.tolist()
+            _guardar_checkpoint(ruta_checkpoint, estado)
+            yield {**paso, "modelo": _modelo_de_paso(paso, clases, max_iter)}
+
+
+def seleccion_hacia_adelante(X_train, y_train, X_val, y_val, base_features, ruta_checkpoint=None, n_procesos=None, max_iter=MAX_ITER):
+    """
+    Selección progresiva hacia adelante partiendo de `base_features`.
+    Genera un diccionario por paso: n_variables, variable añadida, f1,
+    variables y el modelo ajustado con ellas (modelo, coef, intercept).
+    """
+    return _seleccion("adelante", X_train, y_train, X_val, y_val, list(base_features), ruta_checkpoint, n_procesos, max_iter)
+
+
+def seleccion_hacia_atras(X_train, y_train, X_val, y_val, keep_features, ruta_checkpoint=None, n_procesos=None, max_iter=MAX_ITER):
+    """
+    Selección progresiva hacia atrás partiendo del modelo completo; las
+    variables de `keep_features` nunca se eliminan.
+    Genera un diccionario por paso: n_variables, variable eliminada, f1,
+    variables y el modelo ajustado con ellas (modelo, coef, intercept).
+    """
+    return _seleccion("atras", X_train, y_train, X_val, y_val, list(keep_features), ruta_checkpoint, n_procesos, max_iter)
+
+
+def leer_curva(ruta_checkpoint):
+    """
+    Lee de un checkpoint terminado la curva de F1 por número de variables.
+    Devuelve (n_variables, f1_scores, pasos) o None si no existe o está incompleto.
+    """
+    if not os.path.exists(ruta_checkpoint):
+        return None
+    with open(ruta_checkpoint, encoding="utf-8") as f:
+        estado = json.load(f)
+    if not estado.get("terminado"):
+        return None
+    pasos = estado["pasos"]
+    return [p["n_variables"] for p in pasos], [p["f1"] for p in pasos], pasos
@@ -0,0 +1,438 @@
+"""
+Servicio HTTP de predicciones para partidos sueltos.
+
+La página de predicción del dashboard evalúa los modelos sobre partidos ya
+jugados y liga.puntuacion puntúa ficheros enteros; aquí se responde en línea
+a peticiones de uno o pocos partidos. Los modelos de cada liga se cargan una
+sola vez al arrancar (liga.puntuacion.Puntuador) y las peticiones que llegan
+a la vez se reúnen en lotes: cada lote se puntúa con una sola llamada a
+predict_proba / predict, en un hilo aparte para no bloquear el bucle de
+eventos. Mientras se puntúa un lote las peticiones nuevas esperan en la cola
+y forman el siguiente, así que con carga alta los lotes crecen solos.
+
+Solo usa la biblioteca estándar (asyncio.start_server y un parser HTTP/1.1
+mínimo) además de los artefactos del registro de modelos.
+
+Rutas:
+    POST /predecir             un partido (objeto JSON) o varios (lista); cada
+                               uno con Local/HomeTeam, Visitante/AwayTeam, Date
+                               (26/10/2024 o 2024-10-26) y, si se conocen,
+                               cuotas, clima y "Div"
+    GET  /metricas             latencias p50/p99, peticiones y tamaño de lote (JSON)
+    GET  /metricas/prometheus  lo mismo en formato de texto de Prometheus
+    GET  /salud                ligas cargadas y temporadas de sus modelos
+
+Uso desde la terminal:
+    python -m liga.servicio
+    python -m liga.servicio --ligas SP1 E0 --puerto 8080 --tam-lote 128 --espera-ms 5
+    python -m liga.servicio --temporadas 2023-24 2024-25
+    curl -X POST localhost:8765/predecir -d '{"Local": "Real Madrid", "Visitante": "FC Barcelona", "Date": "26/10/2024"}'
+"""
+
+import argparse
+import asyncio
+from collections import deque
+from http import HTTPStatus
+import json
+import math
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from liga.ligas import LIGA_POR_DEFECTO
+from liga.modelos import CARPETA_MODELOS
+from liga.puntuacion import COLUMNAS_SALIDA, RENOMBRAR, Puntuador
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+TAM_LOTE = 64
+ESPERA_LOTE_MS = 2.0
+LATENCIAS_RECIENTES = 10000
+TAM_MAX_CUERPO = 1 << 20  # 1 MB
+COLUMNAS_OBLIGATORIAS = ["Local", "Visitante", "Date"]
+COLUMNAS_TEXTO = ["Local", "Visitante", "Date", "Div", "Estadio", "Time"]
+FORMATO_FECHA = "%d/%m/%Y"
+
+
+class ErrorPeticion(Exception):
+    """
+    Petición que no se puede atender; se responde con `estado` y el mensaje
+    """
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class Metricas:
+    """
+    Latencias de las últimas peticiones y tamaño de los últimos lotes
+    """
+
+    def __init__(self, recientes=LATENCIAS_RECIENTES):
+        self.latencias = deque(maxlen=recientes)
+        self.lotes = deque(maxlen=recientes)
+        self.peticiones = 0
+        self.errores = 0
+        self.partidos = 0
+
+    def anotar_peticion(self, segundos, error=False):
+        self.peticiones += 1
+        self.errores += int(error)
+        self.latencias.append(segundos)
+
+    def anotar_lote(self, partidos):
+        self.partidos += partidos
+        self.lotes.append(partidos)
+
+    def resumen(self):
+        latencias = np.asarray(self.latencias) * 1000
+        p50, p99 = np.percentile(latencias, [50, 99]) if len(latencias) else (np.nan, np.nan)
+        return {
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "partidos": self.partidos,
+            "lotes": len(self.lotes),
+            "partidos_por_lote": round(float(np.mean(self.lotes)), 2) if self.lotes else None,
+            "latencia_p50_ms": None if np.isnan(p50) else round(float(p50), 3),
+            "latencia_p99_ms": None if np.isnan(p99) else round(float(p99), 3),
+            "ventana": len(latencias),
+        }
+
+    def texto_prometheus(self):
+        resumen = self.resumen()
+        metricas = [
+            ("liga_servicio_peticiones_total", "counter", "Peticiones atendidas", resumen["peticiones"]),
+            ("liga_servicio_errores_total", "counter", "Peticiones con error", resumen["errores"]),
+            ("liga_servicio_partidos_total", "counter", "Partidos puntuados", resumen["partidos"]),
+            ("liga_servicio_partidos_por_lote", "gauge", "Partidos por lote (media de los últimos lotes)", resumen["partidos_por_lote"]),
+        ]
+        lineas = []
+        for nombre, tipo, ayuda, valor in metricas:
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}", f"{nombre} {valor if valor is not None else 'NaN'}"]
+        lineas += ["# HELP liga_servicio_latencia_segundos Latencia de las últimas peticiones",
+                   "# TYPE liga_servicio_latencia_segundos summary"]
+        for cuantil, campo in (("0.5", "latencia_p50_ms"), ("0.99", "latencia_p99_ms")):
+            valor = resumen[campo] / 1000 if resumen[campo] is not None else "NaN"
+            lineas.append(f'liga_servicio_latencia_segundos{{quantile="{cuantil}"}} {valor}')
+        lineas.append(f"liga_servicio_latencia_segundos_count {resumen['ventana']}")
+        return "\n".join(lineas) + "\n"
+
+
+# ---------------------------------
+# LOTES
+# ---------------------------------
+class Agrupador:
+    """
+    Cola de partidos de una liga que se puntúan en lotes de como mucho
+    `tam_lote` partidos. Tras recibir el primero se espera `espera` segundos
+    a que lleguen más (0 = puntuar solo lo que ya esté en la cola). Si un
+    lote falla, se parte en mitades que se vuelven a puntuar hasta aislar las
+    peticiones que tienen el error, que son las únicas que fallan.
+    """
+
+    def __init__(self, puntuador, metricas, tam_lote=TAM_LOTE, espera=ESPERA_LOTE_MS / 1000):
+        self.puntuador = puntuador
+        self.metricas = metricas
+        self.tam_lote = tam_lote
+        self.espera = espera
+        self.cola = asyncio.Queue()
+
+    async def predecir(self, filas):
+        """
+        Predicciones de una lista de partidos (diccionarios), en el mismo orden
+        """
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((filas, futuro))
+        return await futuro
+
+    def _recoger(self, pendientes, n):
+        while n < self.tam_lote and not self.cola.empty():
+            filas, futuro = self.cola.get_nowait()
+            pendientes.append((filas, futuro))
+            n += len(filas)
+        return n
+
+    async def _puntuar_lote(self, pendientes):
+        df = pd.DataFrame([fila for filas, _ in pendientes for fila in filas])
+        puntuado = await asyncio.get_running_loop().run_in_executor(None, self.puntuador.puntuar, df)
+        self.metricas.anotar_lote(len(df))
+
+        # JSON no tiene NaN: los valores que falten van como null
+        registros = puntuado.astype(object).where(puntuado.notna(), None).to_dict("records")
+        inicio = 0
+        for filas, futuro in pendientes:
+            if not futuro.done():
+                futuro.set_result(registros[inicio:inicio + len(filas)])
+            inicio += len(filas)
+
+    async def _puntuar(self, pendientes):
+        try:
+            await self._puntuar_lote(pendientes)
+        except Exception as error:
+            if len(pendientes) == 1:
+                if not pendientes[0][1].done():
+                    pendientes[0][1].set_exception(error)
+                return
+            # Una petición incorrecta no debe tumbar al resto del lote: se
+            # parte en dos mitades hasta aislarla (log2(n) lotes por error)
+            mitad = len(pendientes) // 2
+            await self._puntuar(pendientes[:mitad])
+            await self._puntuar(pendientes[mitad:])
+
+    async def bucle(self):
+        while True:
+            pendientes = [await self.cola.get()]
+            n = self._recoger(pendientes, len(pendientes[0][0]))
+            if n < self.tam_lote and self.espera > 0:
+                await asyncio.sleep(self.espera)
+                n = self._recoger(pendientes, n)
+
+            await self._puntuar(pendientes)
+
+
+# ---------------------------------
+# HTTP
+# ---------------------------------
+async def leer_peticion(reader):
+    """
+    Lee una petición HTTP/1.1: (método, ruta, versión, cabeceras, cuerpo), o
+    None si el cliente ha cerrado la conexión
+    """
+    linea = await reader.readline()
+    if not linea:
+        return None
+    partes = linea.decode("latin-1").split()
+    if len(partes) != 3:
+        raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Línea de petición incorrecta")
+    metodo, ruta, version = partes
+
+    cabeceras = {}
+    while True:
+        linea = await reader.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    try:
+        longitud = int(cabeceras.get("content-length", 0))
+    except ValueError:
+        raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Content-Length incorrecto")
+    if longitud > TAM_MAX_CUERPO:
+        raise ErrorPeticion(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"El cuerpo supera {TAM_MAX_CUERPO} bytes")
+    cuerpo = await reader.readexactly(longitud) if longitud else b""
+    return metodo.upper(), urlsplit(ruta).path, version, cabeceras, cuerpo
+
+
+async def escribir_respuesta(writer, estado, cuerpo, tipo="application/json", mantener=True):
+    if not isinstance(cuerpo, (bytes, str)):
+        cuerpo = json.dumps(cuerpo, ensure_ascii=False)
+    if isinstance(cuerpo, str):
+        cuerpo = cuerpo.encode("utf-8")
+    estado = HTTPStatus(estado)
+    cabecera = (f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+                f"Content-Type: {tipo}; charset=utf-8\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    writer.write(cabecera.encode("latin-1") + cuerpo)
+    await writer.drain()
+
+
+def _mantener_conexion(version, cabeceras):
+    conexion = cabeceras.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return conexion == "keep-alive"
+    return conexion != "close"
+
+
+# ---------------------------------
+# SERVICIO
+# ---------------------------------
+def _es_numero(valor):
+    # Las cuotas de football-data pueden llegar como texto y los huecos en
+    # blanco; json.loads admite NaN, Infinity y 1e400 (infinito), que no valen
+    if isinstance(valor, str):
+        if not valor.strip():
+            return True
+        try:
+            valor = float(valor)
+        except ValueError:
+            return False
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+
+
+def _leer_fecha(texto):
+    # ISO (2024-10-26) o con el día primero, como en football-data (26/10/2024)
+    fecha = pd.to_datetime(texto, format="ISO8601", errors="coerce")
+    return fecha if pd.notna(fecha) else pd.to_datetime(texto, dayfirst=True, errors="coerce")
+
+
+class Servicio:
+    """
+    Modelos cargados, una cola de lotes por liga y las métricas de latencia
+    """
+
+    def __init__(self, ligas=(LIGA_POR_DEFECTO,), carpeta=CARPETA_MODELOS, tam_lote=TAM_LOTE,
+                 espera_ms=ESPERA_LOTE_MS, z=2.0, temporadas=None):
+        self.liga_por_defecto = ligas[0]
+        self.metricas = Metricas()
+        self.puntuadores = {}
+        for liga in ligas:
+            try:
+                self.puntuadores[liga] = Puntuador(liga, temporadas, carpeta, z)
+            except (FileNotFoundError, ValueError) as error:
+                # Sin modelo o con un modelo antiguo: se sirven las demás ligas
+                print(f"   [AVISO] {error}")
+        if not self.puntuadores:
+            raise FileNotFoundError(f"No hay modelos entrenados de ninguna de las ligas {list(ligas)} en {carpeta}")
+        self.columnas_numericas = set().union(*(p.columnas_numericas for p in self.puntuadores.values()))
+        self.tam_lote = tam_lote
+        self.espera = espera_ms / 1000
+        self.agrupadores = {}
+        self._tareas = []
+
+    def _arrancar_agrupadores(self):
+        # La cola y la tarea se crean dentro del bucle de eventos que las usa
+        for liga, puntuador in self.puntuadores.items():
+            self.agrupadores[liga] = Agrupador(puntuador, self.metricas, self.tam_lote, self.espera)
+            self._tareas.append(asyncio.create_task(self.agrupadores[liga].bucle()))
+
+    def _partidos(self, cuerpo):
+        try:
+            datos = json.loads(cuerpo or b"null")
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo no es JSON válido")
+        uno = isinstance(datos, dict)
+        partidos = [datos] if uno else datos
+        if not isinstance(partidos, list) or not partidos or not all(isinstance(p, dict) for p in partidos):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Se espera un partido (objeto JSON) o una lista de partidos")
+        partidos = [{RENOMBRAR.get(k, k): v for k, v in p.items()} for p in partidos]
+        for i, partido in enumerate(partidos):
+            faltan = [c for c in COLUMNAS_OBLIGATORIAS if partido.get(c) in (None, "")]
+            if faltan:
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"Al partido {i} le falta: {', '.join(faltan)}")
+            # Los tipos se comprueban aquí: un valor incorrecto haría fallar el lote entero
+            compuestos = [c for c, v in partido.items() if isinstance(v, (list, dict))]
+            if compuestos:
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"En el partido {i} no pueden ser listas ni objetos: {', '.join(compuestos)}")
+            no_texto = [c for c in COLUMNAS_TEXTO if partido.get(c) is not None and not isinstance(partido[c], str)]
+            if no_texto:
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"En el partido {i} deben ser texto: {', '.join(no_texto)}")
+            no_numeros = [c for c in self.columnas_numericas if partido.get(c) is not None and not _es_numero(partido[c])]
+            if no_numeros:
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"En el partido {i} deben ser números finitos o null: {', '.join(sorted(no_numeros))}")
+            fecha = _leer_fecha(partido["Date"])
+            if pd.isna(fecha):
+                raise ErrorPeticion(HTTPStatus.BAD_REQUEST, f"La fecha del partido {i} no es válida: {partido['Date']}")
+            # Mismo formato en todo el lote: pandas deduce el formato de la primera fecha
+            partido["Date"] = fecha.strftime(FORMATO_FECHA)
+        return partidos, uno
+
+    async def predecir(self, cuerpo):
+        partidos, uno = self._partidos(cuerpo)
+        por_liga = {}
+        for i, partido in enumerate(partidos):
+            por_liga.setdefault(partido.get("Div") or self.liga_por_defecto, []).append(i)
+        sin_modelo = [liga for liga in por_liga if liga not in self.agrupadores]
+        if sin_modelo:
+            raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"No hay modelos cargados de: {', '.join(map(str, sin_modelo))}")
+
+        ligas = list(por_liga)
+        resultados = await asyncio.gather(*(
+            self.agrupadores[liga].predecir([partidos[i] for i in por_liga[liga]]) for liga in ligas
+        ))
+        predicciones = [None] * len(partidos)
+        for liga, registros in zip(ligas, resultados):
+            for i, registro in zip(por_liga[liga], registros):
+                predicciones[i] = {c: registro.get(c) for c in COLUMNAS_SALIDA}
+        return predicciones[0] if uno else predicciones
+
+    async def atender(self, metodo, ruta, cuerpo):
+        """
+        (estado, cuerpo, tipo) de la respuesta a una petición
+        """
+        if ruta == "/predecir" and metodo == "POST":
+            return HTTPStatus.OK, await self.predecir(cuerpo), "application/json"
+        if ruta == "/metricas" and metodo == "GET":
+            return HTTPStatus.OK, self.metricas.resumen(), "application/json"
+        if ruta == "/metricas/prometheus" and metodo == "GET":
+            return HTTPStatus.OK, self.metricas.texto_prometheus(), "text/plain; version=0.0.4"
+        if ruta == "/salud" and metodo == "GET":
+            ligas = {liga: list(puntuador.temporadas) for liga, puntuador in self.puntuadores.items()}
+            return HTTPStatus.OK, {"estado": "ok", "ligas": ligas}, "application/json"
+        if ruta in ("/predecir", "/metricas", "/metricas/prometheus", "/salud"):
+            raise ErrorPeticion(HTTPStatus.METHOD_NOT_ALLOWED, f"Método no permitido: {metodo}")
+        raise ErrorPeticion(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {ruta}")
+
+    async def conexion(self, reader, writer):
+        try:
+            while True:
+                try:
+                    peticion = await leer_peticion(reader)
+                except ErrorPeticion as error:
+                    await escribir_respuesta(writer, error.estado, {"error": str(error)}, mantener=False)
+                    break
+                if peticion is None:
+                    break
+                inicio = time.perf_counter()
+                metodo, ruta, version, cabeceras, cuerpo = peticion
+                mantener = _mantener_conexion(version, cabeceras)
+                try:
+                    estado, respuesta, tipo = await self.atender(metodo, ruta, cuerpo)
+                except ErrorPeticion as error:
+                    estado, respuesta, tipo = error.estado, {"error": str(error)}, "application/json"
+                except Exception as error:
+                    estado, respuesta, tipo = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(error)}, "application/json"
+                await escribir_respuesta(writer, estado, respuesta, tipo, mantener)
+                # Las métricas miden las predicciones, no las consultas de métricas
+                if ruta == "/predecir":
+                    self.metricas.anotar_peticion(time.perf_counter() - inicio, error=estado != HTTPStatus.OK)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host=HOST, puerto=PUERTO, listo=None):
+        """
+        Atiende peticiones hasta que se cancele. `listo` (asyncio.Event) se
+        activa cuando el servidor ya escucha.
+        """
+        self._arrancar_agrupadores()
+        servidor = await asyncio.start_server(self.conexion, host, puerto)
+        print(f"   [OK] Sirviendo {', '.join(self.puntuadores)} en http://{host}:{puerto}")
+        if listo is not None:
+            listo.set()
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            for tarea in self._tareas:
+                tarea.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP de predicción de resultado y asistencia con lotes automáticos")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--ligas", nargs="+", default=[LIGA_POR_DEFECTO], help="Ligas cuyos modelos se cargan (la primera es la de los partidos sin Div)")
+    parser.add_argument("--temporadas", nargs="+", help="Temporadas con las que se entrenaron los modelos (por defecto, la última de cada liga)")
+    parser.add_argument("--modelos", default=CARPETA_MODELOS, help="Carpeta del registro de modelos")
+    parser.add_argument("--tam-lote", type=int, default=TAM_LOTE, help="Partidos máximos por lote")
+    parser.add_argument("--espera-ms", type=float, default=ESPERA_LOTE_MS, help="Milisegundos que se espera a completar un lote")
+    parser.add_argument("-z", type=float, default=2.0, help="Anchura del intervalo de asistencia (media ± z·std)")
+    args = parser.parse_args(argv)
+
+    servicio = Servicio(args.ligas, args.modelos, args.tam_lote, args.espera_ms, args.z, args.temporadas)
+    try:
+        asyncio.run(servicio.servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Generador de temporadas sintéticas con el mismo esquema que los partidos reales.
+
+Solo tenemos una temporada (380 partidos), así que para probar cargas,
+filtros y modelos a escala se generan N temporadas a partir de lo que se
+aprende del CSV real:
+- calendario: liga a doble vuelta de los mismos equipos (método del círculo),
+  con el reparto real de días de la semana y horarios;
+- goles: Poisson con ataque y defensa de cada equipo (en casa y fuera); los
+  del descanso son una fracción binomial de los finales;
+- tiros, faltas, córners y tarjetas: Poisson con la media de cada equipo
+  como local o visitante (tiros a puerta acotados por los tiros totales);
+- asistencia: normal con la media y la desviación de cada equipo en casa;
+- clima: una fila real del mismo estadio en la fecha del año más cercana;
+- cuotas y resto de columnas: el bloque completo de un partido real con una
+  diferencia de goles esperada parecida, para conservar la relación entre
+  las ~100 columnas de cuotas.
+
+Las fechas se repiten cada CICLO_TEMPORADAS temporadas: pandas guarda las
+fechas en nanosegundos y no pasan del año 2262, así que con miles de
+temporadas (1M de partidos) varias comparten años del calendario.
+
+Cada temporada se genera con su propia semilla derivada de la global, así que
+el resultado es reproducible y se puede escribir por bloques (una temporada
+cada vez) en CSV o Parquet.
+
+Uso desde la terminal:
+    python -m liga.sintetico --temporadas 30 --salida outputs/sintetico/partidos_x30.csv
+    python -m liga.sintetico --temporadas 2600 --formato parquet --salida outputs/sintetico/partidos_1M.parquet
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from liga.almacen import RUTA_CSV_PARTIDOS
+
+CARPETA_SINTETICO = "outputs/sintetico"
+SEMILLA = 0
+VECINOS_CUOTAS = 5   # partidos reales entre los que se elige el bloque de cuotas
+CICLO_TEMPORADAS = 200   # años distintos del calendario (datetime64[ns] acaba en 2262)
+
+COLUMNAS_PARTIDO = ["Local", "Visitante", "Estadio", "Longitud", "Latitud", "Date", "Time"]
+COLUMNAS_GOLES = ["FTHG", "FTAG", "FTR", "HTHG", "HTAG", "HTR"]
+# (columna del local, columna del visitante)
+PARES_ESTADISTICAS = [("HS", "AS"), ("HF", "AF"), ("HC", "AC"), ("HY", "AY"), ("HR", "AR")]
+PARES_A_PUERTA = [("HST", "HS"), ("AST", "AS")]
+COLUMNAS_CLIMA = ["Temperatura_C", "Sensacion_Termica_C", "Precipitacion_mm", "Viento_kmh", "Codigo_Clima"]
+
+
+def _resultado(local, visitante):
+    return np.where(local > visitante, "H", np.where(local < visitante, "A", "D"))
+
+
+class ModeloTemporadas:
+    """
+    Lo aprendido de los partidos reales para generar temporadas nuevas
+    """
+
+    def __init__(self, df):
+        self.columnas = list(df.columns)
+        self.df = df.reset_index(drop=True)
+        fechas = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
+        self.inicio_temporada = fechas.min()
+        self.equipos = sorted(df["Local"].unique())
+
+        # Fuerza de cada equipo (ataque y defensa relativos a la media de la liga)
+        media_local, media_visitante = df["FTHG"].mean(), df["FTAG"].mean()
+        en_casa = df.groupby("Local")
+        fuera = df.groupby("Visitante")
+        self.media_local, self.media_visitante = media_local, media_visitante
+        self.ataque_casa = (en_casa["FTHG"].mean() / media_local).reindex(self.equipos)
+        self.defensa_casa = (en_casa["FTAG"].mean() / media_visitante).reindex(self.equipos)
+        self.ataque_fuera = (fuera["FTAG"].mean() / media_visitante).reindex(self.equipos)
+        self.defensa_fuera = (fuera["FTHG"].mean() / media_local).reindex(self.equipos)
+        self.fraccion_descanso = (df["HTHG"].sum() + df["HTAG"].sum()) / max(1, df["FTHG"].sum() + df["FTAG"].sum())
+
+        # Medias por equipo de las estadísticas de juego
+        self.estadisticas_local = en_casa[[h for h, _ in PARES_ESTADISTICAS]].mean()
+        self.estadisticas_visitante = fuera[[a for _, a in PARES_ESTADISTICAS]].mean()
+        self.precision = {tiros: df[a_puerta].sum() / max(1, df[tiros].sum()) for a_puerta, tiros in PARES_A_PUERTA}
+
+        # Asistencia y estadios de cada equipo local
+        self.asistencia = en_casa["Asistencia"].agg(["mean", "std", "min", "max"]).fillna(0)
+        self.estadios = {equipo: grupo[["Estadio", "Longitud", "Latitud"]].value_counts(normalize=True)
+                         for equipo, grupo in en_casa}
+
+        # Clima: filas reales de cada estadio ordenadas por día del año
+        self.dia_del_anio = fechas.dt.dayofyear.to_numpy()
+        self.filas_estadio = {estadio: np.asarray(idx) for estadio, idx in df.groupby("Estadio").groups.items()}
+
+        # Cuotas y columnas restantes: bloques reales ordenados por diferencia de goles esperada
+        self.columnas_bloque = [c for c in self.columnas if c not in
+                                set(COLUMNAS_PARTIDO + COLUMNAS_GOLES + COLUMNAS_CLIMA + ["Asistencia", "HST", "AST"]
+                                    + [c for par in PARES_ESTADISTICAS for c in par])]
+        diferencia = self._esperados(df["Local"].to_numpy(), df["Visitante"].to_numpy())
+        self.orden_bloques = np.argsort(diferencia[0] - diferencia[1], kind="stable")
+        self.diferencia_ordenada = (diferencia[0] - diferencia[1])[self.orden_bloques]
+
+        # Calendario: reparto de días de la semana y de horarios
+        self.dias_semana = fechas.dt.dayofweek.value_counts(normalize=True)
+        self.horarios = df["Time"].value_counts(normalize=True)
+
+    def _esperados(self, locales, visitantes):
+        goles_local = self.media_local * self.ataque_casa[locales].to_numpy() * self.defensa_fuera[visitantes].to_numpy()
+        goles_visitante = self.media_visitante * self.ataque_fuera[visitantes].to_numpy() * self.defensa_casa[locales].to_numpy()
+        return goles_local, goles_visitante
+
+    # ---------------------------------
+    # CALENDARIO
+    # ---------------------------------
+    def calendario(self, temporada, rng):
+        """
+        Cruces (local, visitante, fecha, hora) de una liga a doble vuelta
+        """
+        equipos = list(rng.permutation(self.equipos))
+        if len(equipos) % 2:
+            equipos.append(None)
+        n = len(equipos)
+        jornadas = []
+        for ronda in range(n - 1):
+            cruces = [(equipos[i], equipos[n - 1 - i]) for i in range(n // 2)]
+            # Alternamos quién juega en casa para repartir los partidos
+            jornadas.append([(a, b) if (ronda + i) % 2 == 0 else (b, a) for i, (a, b) in enumerate(cruces)])
+            equipos = [equipos[0], equipos[-1]] + equipos[1:-1]
+        jornadas += [[(b, a) for a, b in jornada] for jornada in jornadas]
+
+        inicio = self.inicio_temporada + pd.DateOffset(years=temporada % CICLO_TEMPORADAS)
+        inicio -= pd.Timedelta(days=inicio.dayofweek)   # lunes de la primera semana
+        filas = []
+        for j, jornada in enumerate(jornadas):
+            for local, visitante in jornada:
+                if local is None or visitante is None:
+                    continue
+                dia = rng.choice(self.dias_semana.index.to_numpy(), p=self.dias_semana.to_numpy())
+                filas.append((local, visitante, inicio + pd.Timedelta(weeks=j, days=int(dia))))
+        calendario = pd.DataFrame(filas, columns=["Local", "Visitante", "Fecha"])
+        calendario["Time"] = rng.choice(self.horarios.index.to_numpy(), size=len(calendario), p=self.horarios.to_numpy())
+        return calendario.sort_values(["Fecha", "Time"], kind="stable", ignore_index=True)
+
+    # ---------------------------------
+    # TEMPORADA
+    # ---------------------------------
+    def temporada(self, temporada, rng):
+        """
+        DataFrame de una temporada con las mismas columnas (y orden) que los datos reales
+        """
+        partidos = self.calendario(temporada, rng)
+        locales, visitantes = partidos["Local"].to_numpy(), partidos["Visitante"].to_numpy()
+        n = len(partidos)
+        salida = {}
+
+        # Estadio de cada local según su reparto real
+        estadios = np.empty((n, 3), dtype=object)
+        for equipo, posiciones in pd.Series(np.arange(n)).groupby(locales).groups.items():
+            reparto = self.estadios[equipo]
+            elegidos = rng.choice(len(reparto), size=len(posiciones), p=reparto.to_numpy())
+            estadios[np.asarray(posiciones)] = np.array(reparto.index.tolist(), dtype=object)[elegidos]
+        salida["Local"], salida["Visitante"] = locales, visitantes
+        salida["Estadio"], salida["Longitud"], salida["Latitud"] = estadios[:, 0], estadios[:, 1].astype(float), estadios[:, 2].astype(float)
+
+        asistencia = self.asistencia.loc[locales]
+        valores = rng.normal(asistencia["mean"].to_numpy(), asistencia["std"].to_numpy())
+        salida["Asistencia"] = np.clip(valores, asistencia["min"].to_numpy() * 0.9, asistencia["max"].to_numpy()).round().astype(np.int64)
+        salida["Date"] = partidos["Fecha"].dt.strftime("%d/%m/%Y").to_numpy()
+        salida["Time"] = partidos["Time"].to_numpy()
+
+        # Goles
+        esperados_local, esperados_visitante = self._esperados(locales, visitantes)
+        fthg, ftag = rng.poisson(esperados_local), rng.poisson(esperados_visitante)
+        hthg, htag = rng.binomial(fthg, self.fraccion_descanso), rng.binomial(ftag, self.fraccion_descanso)
+        salida.update({"FTHG": fthg, "FTAG": ftag, "FTR": _resultado(fthg, ftag),
+                       "HTHG": hthg, "HTAG": htag, "HTR": _resultado(hthg, htag)})
+
+        # Estadísticas de juego
+        for col_local, col_visitante in PARES_ESTADISTICAS:
+            salida[col_local] = rng.poisson(self.estadisticas_local[col_local].reindex(locales).to_numpy())
+            salida[col_visitante] = rng.poisson(self.estadisticas_visitante[col_visitante].reindex(visitantes).to_numpy())
+        for a_puerta, tiros in PARES_A_PUERTA:
+            goles = fthg if a_puerta == "HST" else ftag
+            salida[a_puerta] = np.minimum(np.maximum(rng.binomial(salida[tiros], self.precision[tiros]), goles), np.maximum(salida[tiros], goles))
+            salida[tiros] = np.maximum(salida[tiros], salida[a_puerta])
+
+        # Clima: fila real del mismo estadio con el día del año más cercano
+        dias = partidos["Fecha"].dt.dayofyear.to_numpy()
+        filas_clima = np.empty(n, dtype=np.int64)
+        for i, (estadio, dia) in enumerate(zip(salida["Estadio"], dias)):
+            candidatas = self.filas_estadio[estadio]
+            distancia = np.abs(self.dia_del_anio[candidatas] - dia)
+            distancia = np.minimum(distancia, 366 - distancia)
+            filas_clima[i] = candidatas[np.argmin(distancia + rng.random(len(candidatas)))]
+        for columna in COLUMNAS_CLIMA:
+            salida[columna] = self.df[columna].to_numpy()[filas_clima]
+
+        # Cuotas y demás columnas: bloque de un partido real con diferencia esperada parecida
+        posicion = np.searchsorted(self.diferencia_ordenada, esperados_local - esperados_visitante)
+        posicion = np.clip(posicion + rng.integers(-VECINOS_CUOTAS // 2, VECINOS_CUOTAS // 2 + 1, size=n), 0, len(self.orden_bloques) - 1)
+        bloques = self.df.loc[self.orden_bloques[posicion], self.columnas_bloque].reset_index(drop=True)
+        for columna in self.columnas_bloque:
+            salida[columna] = bloques[columna].to_numpy()
+
+        temporada_df = pd.DataFrame(salida)[self.columnas]
+        return temporada_df.astype(self.df.dtypes.to_dict())
+
+
+# ---------------------------------
+# ESCRITURA POR BLOQUES
+# ---------------------------------
+def generar_temporadas(df, temporadas, semilla=SEMILLA):
+    """
+    Genera las temporadas de una en una (iterador de DataFrames)
+    """
+    modelo = ModeloTemporadas(df)
+    for i, secuencia in enumerate(np.random.SeedSequence(semilla).spawn(temporadas)):
+        yield modelo.temporada(i, np.random.default_rng(secuencia))
+
+
+def escribir_sintetico(ruta_salida, temporadas, semilla=SEMILLA, ruta_csv=RUTA_CSV_PARTIDOS, formato=None):
+    """
+    Escribe `temporadas` temporadas sintéticas en CSV o Parquet, una temporada
+    por bloque. Devuelve el número de partidos escritos.
+    """
+    formato = formato or ("parquet" if ruta_salida.endswith(".parquet") else "csv")
+    df = pd.read_csv(ruta_csv)
+    os.makedirs(os.path.dirname(ruta_salida) or ".", exist_ok=True)
+    ruta_tmp = ruta_salida + ".tmp"
+    total = 0
+    if formato == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        escritor = None
+        for temporada in generar_temporadas(df, temporadas, semilla):
+            tabla = pa.Table.from_pandas(temporada, preserve_index=False)
+            escritor = escritor or pq.ParquetWriter(ruta_tmp, tabla.schema)
+            escritor.write_table(tabla)
+            total += len(temporada)
+        if escritor:
+            escritor.close()
+    else:
+        with open(ruta_tmp, "w", encoding="utf-8-sig", newline="") as f:
+            for i, temporada in enumerate(generar_temporadas(df, temporadas, semilla)):
+                temporada.to_csv(f, index=False, header=(i == 0))
+                total += len(temporada)
+    os.replace(ruta_tmp, ruta_salida)
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera temporadas sintéticas con el esquema de los partidos reales")
+    parser.add_argument("--temporadas", type=int, default=10)
+    parser.add_argument("--salida", help="Fichero .csv o .parquet (por defecto, en outputs/sintetico/)")
+    parser.add_argument("--formato", choices=["csv", "parquet"])
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    args = parser.parse_args(argv)
+
+    extension = args.formato or "csv"
+    salida = args.salida or os.path.join(CARPETA_SINTETICO, f"partidos_x{args.temporadas}.{extension}")
+    total = escribir_sintetico(salida, args.temporadas, args.semilla, formato=args.formato)
+    print(f"   [OK] {total} partidos ({args.temporadas} temporadas) en: {salida}")
+
+
+if __name__ == "__main__":
+    main()
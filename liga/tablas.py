@@ -0,0 +1,99 @@
+"""
+Tablas paginadas sobre Arrow para las páginas de Datos y Clima.
+
+`st.dataframe(df_filt)` enviaba al navegador todas las filas y las ~140
+columnas en cada recarga. `TablaArrow` guarda los partidos (con sus columnas
+derivadas) una sola vez como tabla de Arrow y, para cada filtro, trabaja con
+posiciones de filas:
+- ordenar: se ordena solo la columna elegida de las filas filtradas;
+- proyectar y paginar: se extraen únicamente las filas de la página y las
+  columnas elegidas;
+- exportar: CSV o Parquet escritos por bloques de filas, sin pasar por una
+  copia de pandas de toda la selección.
+"""
+
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+TAM_PAGINA = 50
+TAM_BLOQUE = 10000
+
+
+class TablaArrow:
+    """
+    Partidos en una tabla de Arrow, consultados por posiciones de filas
+    """
+
+    def __init__(self, df):
+        self.tabla = pa.Table.from_pandas(df, preserve_index=False)
+        self.columnas = self.tabla.column_names
+
+    def __len__(self):
+        return self.tabla.num_rows
+
+    def filas(self, seleccion=None):
+        """
+        Posiciones de una selección de IndiceFiltros (slice o array); None = todas
+        """
+        if seleccion is None:
+            return np.arange(len(self))
+        if isinstance(seleccion, slice):
+            return np.arange(len(self))[seleccion]
+        return np.asarray(seleccion, dtype=np.int64)
+
+    def ordenar(self, filas, columna, ascendente=True):
+        """
+        Reordena las posiciones según `columna` (los vacíos al final)
+        """
+        if columna is None or not len(filas):
+            return filas
+        valores = self.tabla.column(columna).take(pa.array(filas))
+        if pa.types.is_dictionary(valores.type):
+            # Arrow no ordena columnas de categorías: se ordenan por su valor
+            valores = valores.cast(valores.type.value_type)
+        orden = pc.array_sort_indices(valores, order="ascending" if ascendente else "descending", null_placement="at_end")
+        return filas[orden.to_numpy()]
+
+    def pagina(self, filas, columnas=None, numero=0, tam=TAM_PAGINA):
+        """
+        DataFrame con las filas de la página `numero` (desde 0) y solo `columnas`
+        """
+        ventana = filas[numero * tam:(numero + 1) * tam]
+        tabla = self.tabla.select(columnas) if columnas else self.tabla
+        return tabla.take(pa.array(ventana, type=pa.int64())).to_pandas()
+
+    def bloques(self, filas, columnas=None, tam_bloque=TAM_BLOQUE):
+        """
+        Recorre la selección en RecordBatch de `tam_bloque` filas
+        """
+        tabla = self.tabla.select(columnas) if columnas else self.tabla
+        for inicio in range(0, len(filas), tam_bloque):
+            yield from tabla.take(pa.array(filas[inicio:inicio + tam_bloque], type=pa.int64())).to_batches()
+
+    def esquema(self, columnas=None):
+        return (self.tabla.select(columnas) if columnas else self.tabla).schema
+
+    def exportar_csv(self, filas, columnas=None, destino=None, tam_bloque=TAM_BLOQUE):
+        """
+        Escribe la selección en CSV bloque a bloque. Sin destino devuelve los bytes.
+        """
+        salida = destino if destino is not None else io.BytesIO()
+        with pacsv.CSVWriter(salida, self.esquema(columnas)) as escritor:
+            for bloque in self.bloques(filas, columnas, tam_bloque):
+                escritor.write_batch(bloque)
+        return salida.getvalue() if destino is None else destino
+
+    def exportar_parquet(self, filas, columnas=None, destino=None, tam_bloque=TAM_BLOQUE):
+        """
+        Escribe la selección en Parquet con un row group por bloque. Sin destino devuelve los bytes.
+        """
+        salida = destino if destino is not None else io.BytesIO()
+        with pq.ParquetWriter(salida, self.esquema(columnas)) as escritor:
+            for bloque in self.bloques(filas, columnas, tam_bloque):
+                escritor.write_batch(bloque)
+        return salida.getvalue() if destino is None else destino
@@ -0,0 +1,181 @@
+"""
+Unión de los CSV de partidos, asistencia y coordenadas en `inputs/hop.txt.csv`.
+
+Sustituye al pipeline de Apache Hop `filename.hpl`, que necesitaba la JVM y
+un paso manual en cada actualización de datos. Hace lo mismo que sus pasos:
+- "Merge join" (INNER): SP1_Normalizado (HomeTeam, AwayTeam) con
+  datos_partidos_asistencia (Local, Visitante);
+- "Merge join 2" (LEFT OUTER): Estadio con datos_coordenadas (Estadio_Oficial);
+- "Sort rows 3": orden por fecha y hora;
+- "Text file output": mismo formato de texto que escribía Hop (textos
+  rellenados a su longitud, números con máscara "#.#", CRLF...), de forma que
+  el fichero generado es idéntico al que producía Hop.
+
+Las uniones son hash joins de pandas sobre los ids enteros de equipos y
+estadios (liga.nombres: sin espacios sobrantes, mayúsculas ni tildes, y con
+los alias resueltos), y se informa de las claves que no encuentran pareja en
+lugar de descartarlas en silencio.
+
+Uso desde la terminal:
+    python -m liga.union
+"""
+
+import os
+
+import pandas as pd
+
+from liga.nombres import EQUIPOS, ESTADIOS
+
+RUTA_SP1_NORMALIZADO = "outputs/SP1_Normalizado.csv"
+RUTA_PARTIDOS_ASISTENCIA = "outputs/datos_partidos_asistencia.csv"
+RUTA_COORDENADAS = "outputs/datos_coordenadas.csv"
+RUTA_HOP = "inputs/hop.txt.csv"
+
+# Columnas de texto y longitud a la que las rellenaba Hop
+LONGITUD_TEXTO = {"Local": 18, "Visitante": 18, "Estadio": 29, "FTR": 1, "HTR": 1, "Time": 5}
+LONGITUD_NUMERO = 15
+# Las coordenadas conservan la máscara de lectura (#.########) en lugar de #.#
+COLUMNAS_COORDENADAS = ["Longitud", "Latitud"]
+
+
+def clave_normalizada(serie):
+    """
+    Clave de unión: sin espacios sobrantes y sin distinguir mayúsculas
+    """
+    return serie.astype(str).str.split().str.join(" ").str.casefold()
+
+
+def _sin_pareja(izquierda, derecha, claves_izq, claves_der, columnas):
+    """
+    Filas de `izquierda` cuya clave no aparece en `derecha` (valores originales)
+    """
+    presentes = pd.MultiIndex.from_frame(derecha[claves_der].set_axis(claves_izq, axis=1))
+    fuera = ~pd.MultiIndex.from_frame(izquierda[claves_izq]).isin(presentes)
+    return izquierda.loc[fuera, columnas].drop_duplicates().values.tolist()
+
+
+def unir_partidos(sp1, asistencia, coordenadas):
+    """
+    Une los tres DataFrames como el pipeline de Hop.
+    Devuelve (DataFrame unido, informe de claves sin pareja).
+    """
+    sp1 = sp1.assign(_local=EQUIPOS.ids(sp1["HomeTeam"]), _visitante=EQUIPOS.ids(sp1["AwayTeam"]))
+    asistencia = asistencia.assign(_local=EQUIPOS.ids(asistencia["Local"]), _visitante=EQUIPOS.ids(asistencia["Visitante"]))
+    coordenadas = coordenadas.assign(_estadio=ESTADIOS.ids(coordenadas["Estadio_Oficial"]))
+
+    # Merge join (INNER) por equipos
+    partidos = asistencia.merge(sp1, on=["_local", "_visitante"], how="inner")
+    # Merge join 2 (LEFT OUTER) por estadio
+    partidos["_estadio"] = ESTADIOS.ids(partidos["Estadio"])
+    partidos = partidos.merge(coordenadas, on="_estadio", how="left")
+
+    informe = {
+        "partidos_sin_asistencia": _sin_pareja(sp1, asistencia, ["_local", "_visitante"], ["_local", "_visitante"], ["HomeTeam", "AwayTeam"]),
+        "asistencia_sin_partido": _sin_pareja(asistencia, sp1, ["_local", "_visitante"], ["_local", "_visitante"], ["Local", "Visitante"]),
+        "estadios_sin_coordenadas": sorted(partidos.loc[partidos["Estadio_Oficial"].isna(), "Estadio"].unique().tolist()),
+        "coordenadas_sin_partidos": sorted(set(coordenadas["Estadio_Oficial"]) - set(coordenadas.loc[coordenadas["_estadio"].isin(partidos["_estadio"]), "Estadio_Oficial"])),
+    }
+
+    # Select values: mismas columnas y orden que el fichero de Hop
+    columnas_sp1 = [c for c in sp1.columns if c not in ("Div", "HomeTeam", "AwayTeam", "_local", "_visitante")]
+    partidos = partidos[["Local", "Visitante", "Estadio"] + COLUMNAS_COORDENADAS + ["Asistencia"] + columnas_sp1]
+
+    # Sort rows 3: por fecha y hora; a igualdad, por estadio sin distinguir
+    # mayúsculas, que es el orden en el que llegaban las filas al sort en Hop
+    fecha = pd.to_datetime(partidos["Date"], format="%d/%m/%Y")
+    auxiliar = partidos.assign(_fecha=fecha, _estadio=partidos["Estadio"].str.lower())
+    orden = auxiliar.sort_values(["_fecha", "Time", "_estadio"], kind="stable").index
+    return partidos.loc[orden].reset_index(drop=True), informe
+
+
+def imprimir_informe(informe):
+    etiquetas = {
+        "partidos_sin_asistencia": "Partidos de SP1 sin asistencia",
+        "asistencia_sin_partido": "Partidos con asistencia que no están en SP1",
+        "estadios_sin_coordenadas": "Estadios sin coordenadas",
+        "coordenadas_sin_partidos": "Coordenadas de estadios sin partidos",
+    }
+    for clave, etiqueta in etiquetas.items():
+        valores = informe[clave]
+        if not valores:
+            print(f"   [OK] {etiqueta}: 0")
+            continue
+        print(f"   [AVISO] {etiqueta}: {len(valores)}")
+        for valor in valores:
+            print(f"      - {' vs '.join(valor) if isinstance(valor, list) else valor}")
+
+
+def imprimir_nombres(resolutores=(EQUIPOS, ESTADIOS)):
+    """
+    Avisa de los nombres que no están en liga/nombres.py (con el alias más
+    parecido, si lo hay, por si es el mismo equipo o estadio escrito de otra forma)
+    """
+    for resolutor in resolutores:
+        informe = resolutor.informe()
+        for valor in informe["sin_resolver"]:
+            parecido = informe["aproximados"].get(valor)
+            sugerencia = f" (¿es '{parecido}'?)" if parecido else ""
+            print(f"   [AVISO] {resolutor.nombre}: '{valor}' no está en el diccionario; se deja tal cual{sugerencia}")
+
+
+# ---------------------------------
+# FORMATO DE TEXTO DE HOP
+# ---------------------------------
+def _formatear_numero(serie, decimales):
+    """
+    Máscara "#.#" de Hop: redondeo half-even y sin ceros finales
+    """
+    texto = serie.map(lambda v: f"{v:.{decimales}f}".rstrip("0").rstrip(".") if pd.notna(v) else "")
+    return texto.where(serie.notna(), " " * LONGITUD_NUMERO)
+
+
+def _formatear_columna(nombre, serie):
+    if nombre in LONGITUD_TEXTO:
+        return serie.fillna("").astype(str).str.ljust(LONGITUD_TEXTO[nombre])
+    if nombre == "Date":
+        return serie.astype(str)
+    if nombre in COLUMNAS_COORDENADAS:
+        return _formatear_numero(pd.to_numeric(serie), 8)
+    if pd.api.types.is_integer_dtype(serie):
+        return serie.astype(str)
+    return _formatear_numero(pd.to_numeric(serie), 1)
+
+
+def _encerrar(texto):
+    if "," in texto or '"' in texto:
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+
+def escribir_hop(df, ruta=RUTA_HOP):
+    """
+    Escribe df con el formato del "Text file output" de Hop
+    """
+    columnas = {c: _formatear_columna(c, df[c]).map(_encerrar) for c in df.columns}
+    lineas = [",".join(df.columns)]
+    lineas += [",".join(fila) for fila in zip(*columnas.values())]
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    with open(ruta + ".tmp", "w", encoding="utf-8", newline="") as f:
+        f.write("\r\n".join(lineas) + "\r\n")
+    os.replace(ruta + ".tmp", ruta)
+    return ruta
+
+
+def generar_hop(ruta_sp1=RUTA_SP1_NORMALIZADO, ruta_asistencia=RUTA_PARTIDOS_ASISTENCIA,
+                ruta_coordenadas=RUTA_COORDENADAS, ruta_salida=RUTA_HOP):
+    """
+    Lee los tres CSV, los une y escribe el resultado. Devuelve el informe.
+    """
+    sp1 = pd.read_csv(ruta_sp1, encoding="utf-8-sig")
+    asistencia = pd.read_csv(ruta_asistencia, encoding="utf-8-sig")
+    coordenadas = pd.read_csv(ruta_coordenadas, encoding="utf-8-sig")
+    partidos, informe = unir_partidos(sp1, asistencia, coordenadas)
+    escribir_hop(partidos, ruta_salida)
+    print(f"   [OK] {len(partidos)} partidos unidos en: {ruta_salida}")
+    imprimir_informe(informe)
+    imprimir_nombres()
+    return informe
+
+
+if __name__ == "__main__":
+    generar_hop()
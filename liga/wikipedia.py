@@ -0,0 +1,141 @@
+"""
+Extracción de partidos, asistencia y estadios desde Wikipedia y EstadiosDB.
+
+Son los mismos parsers de los PASOS 2, 3 y 5 de TrabajoFinal1.ipynb, separados
+de la descarga: las páginas se obtienen todas a la vez con
+`liga.descargas.Descargador` y luego se procesan aquí.
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+from liga.descargas import Descargador
+
+
+def extraer_partidos_temporada(html):
+    """
+    Devuelve [local, visitante, estadio, asistencia] de cada partido de La Liga
+    que aparece en la página de temporada de un equipo
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    partidos = []
+    # Buscamos las cajas de los partidos (clase 'vevent' en Wikipedia)
+    for box in soup.find_all("div", {"class": "vevent"}):
+        try:
+            # Verificamos que sea un partido de "La Liga" mirando el encabezado previo
+            prev_header = box.find_previous(["h2", "h3"])
+            if not (prev_header and "la liga" in prev_header.get_text().lower()):
+                continue
+
+            teams_spans = box.find_all("span", class_="fn org")
+            if len(teams_spans) < 2:
+                continue
+            home = teams_spans[0].get_text(strip=True)
+            away = teams_spans[1].get_text(strip=True)
+
+            # Extraemos estadio y asistencia
+            location = box.find("span", class_="location")
+            stadium = location.get_text(strip=True) if location else "Desconocido"
+
+            att_match = re.search(r'Attendance:\s*([\d,]+)', box.get_text())
+            attendance = int(att_match.group(1).replace(",", "")) if att_match else 0
+
+            partidos.append([home, away, stadium, attendance])
+        except Exception:
+            continue
+    return partidos
+
+
+def extraer_estadio(html):
+    """
+    Devuelve [nombre_oficial, latitud, longitud] de la página de un estadio
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # --- EXTRACCIÓN DEL NOMBRE OFICIAL ---
+    nombre_final = "Desconocido"
+    encontrado_en_tabla = False
+    infobox = soup.find("table", class_="infobox")
+    if infobox:
+        for row in infobox.find_all("tr"):
+            header = row.find("th")
+            if header and "Nombre completo" in header.get_text(strip=True):
+                td = row.find("td")
+                if td:
+                    nombre_final = td.get_text(strip=True)
+                    encontrado_en_tabla = True
+                    break
+
+    if not encontrado_en_tabla:
+        h1 = soup.find("h1", id="firstHeading")
+        if h1:
+            nombre_final = h1.get_text(strip=True)
+
+    nombre_final = re.sub(r'\[.*?\]', '', nombre_final).strip()
+
+    # --- EXTRACCIÓN DE COORDENADAS (GEO) ---
+    latitud = None
+    longitud = None
+    geo_span = soup.find("span", class_="geo")
+    if geo_span:
+        coord_text = geo_span.get_text(strip=True)
+        # Manejo de formatos con ";" o con ","
+        coords = coord_text.split(";") if ";" in coord_text else coord_text.split(",")
+        if len(coords) >= 2:
+            latitud = coords[0].strip()
+            longitud = coords[1].strip()
+
+    return [nombre_final, latitud, longitud]
+
+
+def extraer_asistencia_media(html):
+    """
+    Devuelve [club, estadio, asistencia_media] de la tabla resumen de EstadiosDB
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_="arttab")
+    if not table:
+        return []
+
+    filas = []
+    for row in table.find_all("tr")[1:]:  # Saltamos la cabecera
+        cols = row.find_all("td")
+        if len(cols) >= 6:
+            club = cols[1].get_text(strip=True)
+            est = cols[2].get_text(strip=True)
+            # Limpiamos puntos y asteriscos de los números
+            asis_media = int(cols[4].get_text(strip=True).replace(".", "").replace("*", ""))
+            filas.append([club, est, asis_media])
+    return filas
+
+
+def _descargar_y_extraer(urls, extraer, descargador, etiqueta):
+    descargador = descargador or Descargador()
+    respuestas = descargador.descargar(urls)
+    resultados = {}
+    for url in urls:
+        resp = respuestas[url]
+        if resp.texto is None:
+            print(f"   [ERROR] Fallo al leer URL: {url} ({resp.error})")
+            continue
+        estado = "sin cambios" if resp.desde_cache else "descargada"
+        print(f"   > {etiqueta} {url.rsplit('/', 1)[-1]}: {estado}")
+        resultados[url] = extraer(resp.texto)
+    return resultados
+
+
+def scrapear_partidos(urls, descargador=None):
+    """
+    Descarga las páginas de temporada y devuelve la lista de partidos de todas ellas
+    """
+    por_url = _descargar_y_extraer(urls, extraer_partidos_temporada, descargador, "Temporada")
+    return [partido for url in urls for partido in por_url.get(url, [])]
+
+
+def scrapear_estadios(urls, descargador=None):
+    """
+    Descarga las páginas de los estadios y devuelve [nombre, latitud, longitud] de cada una
+    """
+    por_url = _descargar_y_extraer(urls, extraer_estadio, descargador, "Estadio")
+    return [por_url[url] for url in urls if url in por_url]